@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Recall vs latency of the ANN index against exact search.
+
+Run from terminal: python benchmarks/bench_ann_recall.py [--rows N] [--queries N]
+Writes clustered synthetic vectors to a temporary collection, builds the
+vector index through VectorStore.ensure_index, and sweeps nprobes and
+refine_factor. Ground truth comes from a brute-force NumPy scan.
+"""
+
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from lib.vector_store import VectorStore
+
+
+def clustered_vectors(rows: int, dimension: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.3 * rng.standard_normal((rows, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(search, queries, truth, k):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({int(row["id"]) for row in results} & set(expected.tolist()))
+    return hits / (len(queries) * k), float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN recall vs latency benchmark")
+    parser.add_argument("--rows", type=int, default=200000, help="Vectors in the collection")
+    parser.add_argument("--dimension", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=100, help="Queries to run")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(args.rows, args.dimension, max(8, args.rows // 1000), rng)
+    queries = vectors[rng.integers(0, args.rows, args.queries)] + 0.05 * rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+    truth = [np.argsort(((vectors - q) ** 2).sum(axis=1))[:args.k] for q in queries]
+
+    with tempfile.TemporaryDirectory() as db_path:
+        store = VectorStore(db_path=db_path)
+        store.index_manager.min_rows = args.rows + 1  # build explicitly below
+        store.create_collection("bench", dimension=args.dimension)
+        for start in range(0, args.rows, 50000):
+            end = min(start + 50000, args.rows)
+            store.add_documents("bench", [str(i) for i in range(start, end)], [""] * (end - start), vectors[start:end])
+
+        table = store.get_collection("bench")
+        exact = measure(lambda q: table.search(q).bypass_vector_index().limit(args.k).to_list(), queries, truth, args.k)
+
+        start = time.perf_counter()
+        store.ensure_index("bench", force=True)
+        build_seconds = time.perf_counter() - start
+
+        print(f"{args.rows} x {args.dimension}d, {args.queries} queries, recall@{args.k}")
+        print(f"index build: {build_seconds:.1f}s ({store.index_status('bench').get('index_type')})\n")
+        print(f"{'mode':<28} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        print(f"{'exact (no index)':<28} {exact[0]:7.3f} {exact[1]:8.2f} {exact[2]:8.2f}")
+
+        for nprobes in (5, 10, 20, 50):
+            for refine_factor in (None, 5, 20):
+                recall, p50, p95 = measure(
+                    lambda q: store.search("bench", q, limit=args.k, nprobes=nprobes, refine_factor=refine_factor),
+                    queries, truth, args.k
+                )
+                label = f"nprobes={nprobes} refine={refine_factor or '-'}"
+                print(f"{label:<28} {recall:7.3f} {p50:8.2f} {p95:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Benchmark fixed-size vs length-bucketed bulk embedding.
+
+Run from terminal: python benchmarks/bench_bulk_encoding.py [--chunks N]
+Encodes a mixed corpus of short code snippets and long prose chunks.
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from lib.embeddings import LocalEmbeddings
+
+WORDS = (
+    "sovereign local first vector memory retrieval document chunk embedding model "
+    "latency throughput index query store agent context knowledge principle strength"
+).split()
+
+CODE = [
+    "def add(a, b):\n    return a + b",
+    "const x = await fetch(url);",
+    "SELECT id, text FROM documents WHERE id = ?",
+    "fn main() { println!(\"hello\"); }",
+    "for i in range(10): print(i)",
+]
+
+
+def build_corpus(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n):
+        if i % 2:
+            corpus.append(rng.choice(CODE) + f"  # {i}")
+        else:
+            corpus.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 500))))
+    rng.shuffle(corpus)
+    return corpus
+
+
+def run(embeddings: LocalEmbeddings, corpus: list, repeat: int, **kwargs):
+    best = float("inf")
+    vectors = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vectors = embeddings._encode_uncached(corpus, 32, False, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk embedding benchmark")
+    parser.add_argument("--chunks", type=int, default=1000, help="Number of chunks in the corpus")
+    parser.add_argument("--token-budget", type=int, default=8192, help="Padded tokens per bucketed batch")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is reported)")
+    args = parser.parse_args()
+
+    embeddings = LocalEmbeddings(model_name=args.model, use_cache=False)
+    corpus = build_corpus(args.chunks)
+    embeddings._encode_uncached(corpus[:64], 32, False)  # warm up
+
+    fixed_time, fixed = run(embeddings, corpus, args.repeat)
+    bucketed_time, bucketed = run(embeddings, corpus, args.repeat, token_budget=args.token_budget)
+
+    print(f"Corpus: {len(corpus)} chunks, device={embeddings.device}")
+    print(f"  fixed batch_size=32:     {len(corpus) / fixed_time:8.1f} chunks/sec")
+    print(f"  bucketed budget={args.token_budget}: {len(corpus) / bucketed_time:8.1f} chunks/sec")
+    print(f"  speedup: {fixed_time / bucketed_time:.2f}x")
+    print(f"  max abs diff: {np.abs(fixed - bucketed).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
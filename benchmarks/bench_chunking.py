@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Chunking throughput and wasted tokens: word chunks vs token-window chunks.
+
+Run from terminal: python benchmarks/bench_chunking.py [--dir PATH] [--mb N]
+Chunks a directory of text files (or a synthetic prose/code corpus) with
+the 500-word chunker and the tokenizer-aligned chunker. Wasted tokens are
+those past the model's max_seq_length, which are truncated at encode time
+and never influence retrieval.
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from lib.embeddings import LocalEmbeddings
+from lib.chunking import TokenChunker, WordChunker
+from lib.rag_engine import TEXT_EXTENSIONS
+
+WORDS = (
+    "sovereign local first vector memory retrieval document chunk embedding model "
+    "latency throughput index query store agent context knowledge principle strength "
+    "tokenization configuration asynchronous reproducibility interoperability"
+).split()
+
+CODE = [
+    "def add(a, b):\n    return a + b",
+    "const x = await fetch(url);",
+    "SELECT id, text FROM documents WHERE id = ?",
+    "fn main() { println!(\"hello\"); }",
+]
+
+
+def build_corpus(megabytes: float, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    docs, size = [], 0
+    while size < megabytes * 1024 * 1024:
+        parts = []
+        for _ in range(rng.randint(20, 200)):
+            if rng.random() < 0.2:
+                parts.append(rng.choice(CODE))
+            else:
+                parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))) + ".")
+        doc = "\n\n".join(parts)
+        docs.append(doc)
+        size += len(doc.encode("utf-8"))
+    return docs
+
+
+def load_dir(directory: str) -> list:
+    docs = []
+    for path in sorted(Path(directory).rglob("*")):
+        if path.is_file() and path.suffix.lower() in TEXT_EXTENSIONS:
+            try:
+                docs.append(path.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError):
+                continue
+    return docs
+
+
+def token_counts(tokenizer, chunks: list, batch: int = 1024) -> np.ndarray:
+    counts = []
+    for start in range(0, len(chunks), batch):
+        encoded = tokenizer(chunks[start:start + batch], add_special_tokens=True, verbose=False)
+        counts.extend(len(ids) for ids in encoded["input_ids"])
+    return np.asarray(counts, dtype=np.int64)
+
+
+def measure(name: str, chunker, docs: list, tokenizer, max_seq_length: int, mb: float) -> dict:
+    start = time.perf_counter()
+    chunks = [chunk for doc in docs for chunk in chunker.chunk(doc)]
+    seconds = time.perf_counter() - start
+
+    counts = token_counts(tokenizer, chunks)
+    embedded = np.minimum(counts, max_seq_length)
+    return {
+        "chunker": name,
+        "chunks": len(chunks),
+        "mb_per_second": mb / seconds,
+        "tokens": int(counts.sum()),
+        "wasted": int((counts - embedded).sum()),
+        "mean_tokens": float(counts.mean()) if len(counts) else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking throughput and wasted-token benchmark")
+    parser.add_argument("--dir", type=str, help="Directory of text files (default: synthetic corpus)")
+    parser.add_argument("--mb", type=float, default=10.0, help="Synthetic corpus size in MB")
+    parser.add_argument("--overlap", type=int, default=32, help="Token overlap for the token chunker")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model")
+    args = parser.parse_args()
+
+    docs = load_dir(args.dir) if args.dir else build_corpus(args.mb)
+    mb = sum(len(doc.encode("utf-8")) for doc in docs) / 1024 / 1024
+
+    embeddings = LocalEmbeddings(model_name=args.model, use_cache=False)
+    tokenizer, max_seq_length = embeddings.model.tokenizer, embeddings.model.max_seq_length
+    print(f"{len(docs)} documents, {mb:.1f} MB, max_seq_length {max_seq_length}\n")
+
+    results = [
+        measure("words 500/50", WordChunker(500, 50), docs, tokenizer, max_seq_length, mb),
+        measure(
+            f"tokens {max_seq_length}/{args.overlap}",
+            TokenChunker(tokenizer, max_seq_length, overlap_tokens=args.overlap),
+            docs, tokenizer, max_seq_length, mb
+        )
+    ]
+
+    print(f"{'chunker':<16} {'chunks':>8} {'MB/s':>8} {'tokens':>10} {'wasted':>10} {'wasted %':>9} {'tok/chunk':>10}")
+    for r in results:
+        share = r["wasted"] / r["tokens"] if r["tokens"] else 0.0
+        print(
+            f"{r['chunker']:<16} {r['chunks']:>8} {r['mb_per_second']:>8.2f} {r['tokens']:>10} "
+            f"{r['wasted']:>10} {share:>9.1%} {r['mean_tokens']:>10.1f}"
+        )
+
+    embeddings.close()
+
+
+if __name__ == "__main__":
+    main()
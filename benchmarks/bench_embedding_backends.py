@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Benchmark embedding backends: torch, onnx and onnx-int8.
+
+Run from terminal: python benchmarks/bench_embedding_backends.py [--backends torch,onnx,onnx-int8]
+Each backend runs in its own process so import time and RSS are measured
+in isolation. Vectors are checked against the torch backend by cosine
+similarity; the script exits non-zero if a backend is outside tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from bench_bulk_encoding import build_corpus
+
+TOLERANCE = {"torch": 1.0, "onnx": 0.9999, "onnx-int8": 0.99}
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def child(args):
+    start = time.perf_counter()
+    from lib.embeddings import LocalEmbeddings
+    embeddings = LocalEmbeddings(model_name=args.model, backend=args.child, use_cache=False)
+    load_time = time.perf_counter() - start
+
+    corpus = build_corpus(args.chunks)
+    embeddings.encode_array(corpus[:16])  # warm up
+
+    latencies = []
+    for text in corpus[:args.queries]:
+        t0 = time.perf_counter()
+        embeddings.encode_array([text])
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    vectors = embeddings.encode_bulk(corpus)
+    bulk_time = time.perf_counter() - t0
+    np.save(args.output, vectors)
+
+    print(json.dumps({
+        "backend": args.child,
+        "load_seconds": load_time,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "chunks_per_sec": len(corpus) / bulk_time,
+        "peak_rss_mb": peak_rss_mb(),
+        "torch_imported": "torch" in sys.modules
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--backends", type=str, default="torch,onnx,onnx-int8", help="Comma-separated backends")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model")
+    parser.add_argument("--chunks", type=int, default=500, help="Chunks for the throughput run")
+    parser.add_argument("--queries", type=int, default=100, help="Single-text encodes for latency")
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    backends = args.backends.split(",")
+    results = {}
+    vectors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            output = os.path.join(tmp, f"{backend}.npy")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", backend, "--output", output,
+                 "--model", args.model, "--chunks", str(args.chunks), "--queries", str(args.queries)],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"✗ {backend} failed:\n{proc.stderr}")
+                sys.exit(1)
+            results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(output)
+
+    print(f"\n{'backend':<10} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'chunks/s':>9} {'RSS MB':>7} {'min cos':>8}")
+    failed = False
+    for backend in backends:
+        r = results[backend]
+        min_cos = float("nan")
+        if "torch" in vectors:
+            min_cos = float((vectors[backend] * vectors["torch"]).sum(axis=1).min())
+            failed |= min_cos < TOLERANCE.get(backend, 0.99) - 1e-6
+        print(f"{backend:<10} {r['load_seconds']:7.2f} {r['p50_ms']:7.2f} {r['p95_ms']:7.2f} "
+              f"{r['chunks_per_sec']:9.1f} {r['peak_rss_mb']:7.0f} {min_cos:8.5f}")
+
+    if failed:
+        print("\n✗ A backend is outside its cosine tolerance against torch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
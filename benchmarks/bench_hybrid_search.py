@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Hit rate and latency of vector, full-text and hybrid search on code.
+
+Run from terminal: python benchmarks/bench_hybrid_search.py [--docs N] [--queries N]
+Builds a synthetic code corpus where each snippet defines a unique
+function and raises a unique error code, then queries by those exact
+identifiers. A hit means the defining snippet is in the top k.
+"""
+
+import sys
+import time
+import random
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from lib.rag_engine import RAGEngine
+from lib.search_cache import get_search_cache
+from lib.vector_store import SEARCH_MODES
+
+VERBS = ["parse", "load", "sync", "validate", "render", "resolve", "flush", "index", "merge", "export"]
+NOUNS = ["invoice", "ledger", "session", "token", "payload", "manifest", "schema", "report", "account", "batch"]
+
+
+def build_code_corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    docs, identifiers = [], []
+    for i in range(n):
+        verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+        function = f"{verb}_{noun}_{i}"
+        code = f"E{10000 + i}"
+        docs.append(
+            f"def {function}(payload, retries=3):\n"
+            f"    \"\"\"{verb.capitalize()} the {noun} and return the cleaned result.\"\"\"\n"
+            f"    if not payload:\n"
+            f"        raise ServiceError(\"{code}: cannot {verb} empty {noun}\")\n"
+            f"    for attempt in range(retries):\n"
+            f"        result = client.{verb}({noun}=payload, attempt=attempt)\n"
+            f"        if result.ok:\n"
+            f"            return result.value\n"
+            f"    logger.warning(\"{verb} {noun} failed after %d attempts\", retries)\n"
+        )
+        identifiers.append((function, code))
+    return docs, identifiers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid search benchmark on a code corpus")
+    parser.add_argument("--docs", type=int, default=5000, help="Code snippets to ingest")
+    parser.add_argument("--queries", type=int, default=200, help="Identifier queries to run")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model")
+    args = parser.parse_args()
+
+    docs, identifiers = build_code_corpus(args.docs)
+    rng = random.Random(1)
+    targets = rng.sample(range(len(docs)), min(args.queries, len(docs)))
+    queries = [(identifiers[i][j % 2], str(i)) for j, i in enumerate(targets)]
+
+    with tempfile.TemporaryDirectory() as db_path:
+        engine = RAGEngine(vector_db_path=db_path, embeddings_model=args.model)
+        engine.search_cache = get_search_cache(max_bytes=0)  # time every search, not cache hits
+        engine.vector_store.create_collection(engine.collection_name, dimension=engine.embeddings.dimension)
+        engine.vector_store.add_documents(
+            collection_name=engine.collection_name,
+            ids=[str(i) for i in range(len(docs))],
+            texts=docs,
+            vectors=engine.embeddings.encode_bulk(docs),
+            metadatas=[{"type": "code", "language": "python"} for _ in docs]
+        )
+        for query, _ in queries:
+            engine.search(query, mode="hybrid")  # warm query embeddings and the FTS index
+
+        print(f"{len(queries)} identifier queries over {len(docs)} snippets, hit@{args.k}:")
+        for mode in SEARCH_MODES:
+            latencies, hits = [], 0
+            for query, target in queries:
+                start = time.perf_counter()
+                results = engine.search(query, limit=args.k, mode=mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += any(row["id"] == target for row in results)
+            latencies = np.array(latencies)
+            print(f"  {mode:<7} hit rate {hits / len(queries):6.1%}   p50 {np.percentile(latencies, 50):7.2f} ms   "
+                  f"p95 {np.percentile(latencies, 95):7.2f} ms")
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Import-time guard for the lib package.
+
+Run from terminal: python benchmarks/bench_import_time.py [--max-ms 150]
+Runs `python -X importtime` in a fresh interpreter for each target, prints
+the slowest modules, and exits non-zero if a heavy dependency is imported
+eagerly or the cumulative import time exceeds the budget.
+"""
+
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = {"torch", "sentence_transformers", "transformers", "lancedb", "mem0", "anthropic", "ollama", "onnxruntime"}
+
+TARGETS = {
+    "lib": "import lib",
+    "lib.rag_engine": "import lib.rag_engine",
+    "cli": "import runpy; runpy.run_path('scripts/cli.py', run_name='cli')",
+}
+
+
+def measure(statement: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr)
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split("|", 2)
+        modules[name.strip()] = (int(self_us.split(":")[-1]), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lib import-time benchmark")
+    parser.add_argument("--max-ms", type=float, default=400.0, help="Budget for total import time per target")
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules to show")
+    args = parser.parse_args()
+
+    failed = False
+    for target, statement in TARGETS.items():
+        modules = measure(statement)
+        total_ms = sum(self_us for self_us, _ in modules.values()) / 1000
+        heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+
+        status = "✓"
+        if heavy or total_ms > args.max_ms:
+            status = "✗"
+            failed = True
+
+        print(f"{status} {target}: {total_ms:.1f} ms, {len(modules)} modules")
+        for name, (_, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+        if heavy:
+            print(f"    heavy imports: {', '.join(heavy[:10])}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Latency benchmark for repeated RAGEngine.search calls.
+
+Run from terminal: python benchmarks/bench_repeated_search.py [--chunks N] [--queries N]
+Compares searches against cached table handles with searches that reopen
+the table and relist collections on every call (the previous behaviour).
+"""
+
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from lib.rag_engine import RAGEngine
+from lib.search_cache import get_search_cache
+from bench_bulk_encoding import build_corpus
+
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def report(label, latencies):
+    print(f"  {label:<22} mean {latencies.mean():7.2f} ms   p50 {np.percentile(latencies, 50):7.2f} ms   "
+          f"p95 {np.percentile(latencies, 95):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeated search latency benchmark")
+    parser.add_argument("--chunks", type=int, default=2000, help="Chunks to ingest")
+    parser.add_argument("--queries", type=int, default=200, help="Searches per mode")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_path:
+        engine = RAGEngine(vector_db_path=db_path, embeddings_model=args.model)
+        engine.search_cache = get_search_cache(max_bytes=0)  # time every search, not cache hits
+        engine.vector_store.create_collection(engine.collection_name, dimension=engine.embeddings.dimension)
+        corpus = build_corpus(args.chunks)
+        engine.vector_store.add_documents(
+            collection_name=engine.collection_name,
+            ids=[str(i) for i in range(len(corpus))],
+            texts=corpus,
+            vectors=engine.embeddings.encode_bulk(corpus),
+            metadatas=[{"source": "bench"} for _ in corpus]
+        )
+
+        queries = [corpus[i % len(corpus)][:80] for i in range(args.queries)]
+        for query in set(queries):
+            engine.search(query)  # warm query embedding cache
+
+        def uncached(query):
+            engine.vector_store.invalidate()
+            engine.vector_store.list_collections()
+            engine.search(query)
+
+        print(f"{args.queries} searches over {len(corpus)} chunks:")
+        report("reopen every call", timed(uncached, queries))
+        report("cached table handle", timed(engine.search, queries))
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -56,17 +56,18 @@ class GooseRAGToolkit:
             "message": f"Ingested {result['chunks']} chunks"
         }
     
-    def search_knowledge(self, query: str, limit: int = 5) -> dict:
+    def search_knowledge(self, query: str, limit: int = 5, mode: str = "vector") -> dict:
         """Search the knowledge base.
         
         Args:
             query: Search query
             limit: Number of results
+            mode: "vector", "fts" (keyword) or "hybrid"
             
         Returns:
             dict with search results
         """
-        results = self.engine.search(query, limit=limit)
+        results = self.engine.search(query, limit=limit, mode=mode)
         
         formatted_results = []
         for i, doc in enumerate(results, 1):
@@ -82,6 +83,33 @@ class GooseRAGToolkit:
             "results": formatted_results
         }
     
+    def search_knowledge_batch(self, queries: list, limit: int = 5) -> dict:
+        """Search the knowledge base for several queries at once.
+        
+        Args:
+            queries: List of search queries
+            limit: Number of results per query
+            
+        Returns:
+            dict with one result list per query
+        """
+        all_results = self.engine.search_many(queries, limit=limit)
+        
+        return {
+            "status": "success",
+            "count": len(queries),
+            "results": [
+                {
+                    "query": query,
+                    "results": [
+                        {"rank": i, "text": doc["text"], "metadata": doc.get("metadata", {})}
+                        for i, doc in enumerate(results, 1)
+                    ]
+                }
+                for query, results in zip(queries, all_results)
+            ]
+        }
+    
     def search_with_memory(self, query: str, limit: int = 5) -> dict:
         """Search knowledge base with user memory context.
         
@@ -101,7 +129,9 @@ class GooseRAGToolkit:
         return {
             "status": "success",
             "documents": results["documents"],
-            "memories": results["memories"]
+            "memories": results["memories"],
+            "timings": results["timings"],
+            "errors": results["errors"]
         }
     
     def add_memory(self, content: str) -> dict:
@@ -221,7 +251,8 @@ if __name__ == "__main__":
     print("\nAvailable methods:")
     print("- ingest_document(file_path)")
     print("- ingest_text(text, metadata)")
-    print("- search_knowledge(query, limit)")
+    print("- search_knowledge(query, limit, mode)")
+    print("- search_knowledge_batch(queries, limit)")
     print("- search_with_memory(query, limit)")
     print("- add_memory(content)")
     print("- search_memories(query, limit)")
@@ -1,27 +1,40 @@
 """Sovereign RAG Stack - Core Library.
 
 Provides local-first RAG with memory, embeddings, and LLM abstraction.
+Submodules are imported lazily on first attribute access, so `import lib`
+does not pull in torch, lancedb or mem0.
 """
 
-from lib.embeddings import LocalEmbeddings, get_embeddings
-from lib.vector_store import VectorStore, get_vector_store
-from lib.memory_layer import MemoryLayer, get_memory_layer
-from lib.llm_providers import LLMProvider, AnthropicProvider, OllamaProvider, get_llm_provider
-from lib.rag_engine import RAGEngine, get_rag_engine
+import importlib
 
 __version__ = "0.1.0"
 
-__all__ = [
-    "LocalEmbeddings",
-    "get_embeddings",
-    "VectorStore",
-    "get_vector_store",
-    "MemoryLayer",
-    "get_memory_layer",
-    "LLMProvider",
-    "AnthropicProvider",
-    "OllamaProvider",
-    "get_llm_provider",
-    "RAGEngine",
-    "get_rag_engine",
-]
+_LAZY_ATTRS = {
+    "LocalEmbeddings": "lib.embeddings",
+    "get_embeddings": "lib.embeddings",
+    "VectorStore": "lib.vector_store",
+    "get_vector_store": "lib.vector_store",
+    "MemoryLayer": "lib.memory_layer",
+    "get_memory_layer": "lib.memory_layer",
+    "LLMProvider": "lib.llm_providers",
+    "AnthropicProvider": "lib.llm_providers",
+    "OllamaProvider": "lib.llm_providers",
+    "get_llm_provider": "lib.llm_providers",
+    "RAGEngine": "lib.rag_engine",
+    "get_rag_engine": "lib.rag_engine",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'lib' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,167 @@
+"""Text chunkers.
+
+TokenChunker cuts text into windows of the embedding model's tokenizer,
+sized to the model's max_seq_length, so no part of a chunk is truncated
+away at encode time. Chunks are slices of the original text taken at
+token character offsets and never split a word. WordChunker is the
+original whitespace chunker (chunk_size words, overlap words).
+
+Both can also be fed a text in pieces through stream(), which yields the
+same chunks as chunk() on the whole text.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+
+def token_offsets(tokenizer, text: str) -> Tuple[List[Tuple[int, int]], List[Optional[int]]]:
+    """Character offsets and word index of every token in text, without special tokens."""
+    if hasattr(tokenizer, "encode_offsets"):
+        return tokenizer.encode_offsets(text)
+    encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    return encoded["offset_mapping"], encoded.word_ids()
+
+
+class WordChunker:
+    def __init__(self, chunk_size: int = 500, overlap: int = 50):
+        if overlap >= chunk_size:
+            raise ValueError(f"overlap ({overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def chunk(self, text: str) -> List[str]:
+        words = text.split()
+        return [
+            " ".join(words[i:i + self.chunk_size])
+            for i in range(0, len(words), self.chunk_size - self.overlap)
+        ]
+
+    def stream(self) -> "WordWindow":
+        return WordWindow(self.chunk_size, self.overlap)
+
+
+class WordWindow:
+    def __init__(self, chunk_size: int, overlap: int):
+        self.chunk_size = chunk_size
+        self.step = chunk_size - overlap
+        self._words: List[str] = []
+        self._base = 0  # index of _words[0] in the whole text
+        self._next = 0  # start of the next chunk
+
+    def feed(self, text: str) -> List[str]:
+        """Add text ending at a word boundary; returns the chunks completed by it."""
+        self._words.extend(text.split())
+        chunks = []
+        while self._next + self.chunk_size <= self._base + len(self._words):
+            start = self._next - self._base
+            chunks.append(" ".join(self._words[start:start + self.chunk_size]))
+            self._next += self.step
+        drop = min(self._next - self._base, len(self._words))
+        del self._words[:drop]
+        self._base += drop
+        return chunks
+
+    def finish(self) -> List[str]:
+        chunks = []
+        total = self._base + len(self._words)
+        while self._next < total:
+            start = self._next - self._base
+            chunks.append(" ".join(self._words[start:start + self.chunk_size]))
+            self._next += self.step
+        self._words = []
+        return chunks
+
+
+class TokenChunker:
+    def __init__(
+        self,
+        tokenizer,
+        max_seq_length: int,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None
+    ):
+        self.tokenizer = tokenizer
+        special_tokens = len(tokenizer([""], add_special_tokens=True)["input_ids"][0])
+        self.window = max_seq_length - special_tokens  # tokens the model actually sees
+        self.chunk_tokens = min(chunk_tokens or self.window, self.window)
+        if overlap_tokens is None:
+            overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+        if overlap_tokens >= self.chunk_tokens:
+            raise ValueError(f"overlap_tokens ({overlap_tokens}) must be smaller than chunk_tokens ({self.chunk_tokens})")
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, text: str) -> List[str]:
+        return self.split(text, final=True)[0]
+
+    def split(self, text: str, final: bool, skip: int = 0) -> Tuple[List[str], int, int]:
+        """Chunks of text, and where the next chunk starts: a character offset
+        at a word start plus a number of tokens into that word.
+
+        Unless final, the last window is held back because more text may
+        extend it. skip starts the first chunk that many tokens into text.
+        """
+        offsets, words = token_offsets(self.tokenizer, text)
+        n = len(offsets)
+
+        def same_word(i: int) -> bool:
+            return words[i] is not None and words[i] == words[i - 1]
+
+        def word_start(i: int, floor: int) -> int:
+            # move back until token i starts a word, so no word spans two chunks
+            j = i
+            while j > floor and same_word(j):
+                j -= 1
+            if j == floor and same_word(j):
+                return i  # one word fills the window: cut inside it at the limit
+            return j
+
+        def chunk_end(begin: int) -> int:
+            limit = begin + self.chunk_tokens
+            return n if limit >= n else word_start(limit, begin + 1)
+
+        chunks = []
+        start = min(skip, n)
+        while start < n:
+            # the next start is decided by looking one window past this chunk
+            if not final and start + 2 * self.chunk_tokens >= n:
+                break
+            end = chunk_end(start)
+            chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end >= n:
+                start = n
+                break
+            following = word_start(max(end - self.overlap_tokens, start + 1), start + 1)
+            # overlap only if the next chunk reaches past this one, e.g. not before a word that fills a window
+            start = following if chunk_end(following) > end else end
+
+        if start >= n:
+            return chunks, len(text), 0
+        word = start
+        while word > 0 and same_word(word):
+            word -= 1
+        return chunks, offsets[word][0], start - word
+
+    def stream(self, flush_chars: int = 65536) -> "TokenWindow":
+        return TokenWindow(self, flush_chars)
+
+
+class TokenWindow:
+    def __init__(self, chunker: TokenChunker, flush_chars: int):
+        self.chunker = chunker
+        self.flush_chars = flush_chars
+        self._text = ""  # starts at the word holding the next chunk's first token
+        self._skip = 0  # tokens into that word where the chunk starts
+
+    def feed(self, text: str) -> List[str]:
+        """Add text ending at a word boundary; returns the chunks completed by it."""
+        self._text += text
+        if len(self._text) < self.flush_chars:
+            return []
+        chunks, consumed, self._skip = self.chunker.split(self._text, final=False, skip=self._skip)
+        self._text = self._text[consumed:]
+        return chunks
+
+    def finish(self) -> List[str]:
+        chunks = self.chunker.split(self._text, final=True, skip=self._skip)[0]
+        self._text, self._skip = "", 0
+        return chunks
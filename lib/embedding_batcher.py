@@ -0,0 +1,140 @@
+"""Dynamic micro-batching for concurrent single-text embedding requests.
+
+Requests are queued and flushed to the model as one batch once the batch
+is full or the oldest request has waited max_wait_ms.
+"""
+
+import os
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from lib.embeddings import LocalEmbeddings
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        embeddings: LocalEmbeddings,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDINGS_MAX_BATCH_SIZE", "32"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("EMBEDDINGS_MAX_WAIT_MS", "2"))
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.requests = 0
+        self.batched = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+            self.requests += 1
+            self._queue.put((text, future))
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def encode_single(self, text: str) -> List[float]:
+        return self.submit(text).result().tolist()
+
+    def encode_single_array(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def aencode_single_array(self, text: str) -> "asyncio.Future[np.ndarray]":
+        return asyncio.wrap_future(self.submit(text))
+
+    async def aencode_single(self, text: str) -> List[float]:
+        return (await self.aencode_single_array(text)).tolist()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[str, Future]]):
+        live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.batched += len(live)
+            self.max_batch_seen = max(self.max_batch_seen, len(live))
+
+        try:
+            # queries skip the persistent document cache; see QueryEmbeddingCache
+            vectors = self.embeddings.encode_array([text for text, _ in live], use_cache=False)
+        except Exception as e:
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(live, vectors):
+            future.set_result(vector)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": self.batched / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "max_wait_ms": self.max_wait * 1000.0
+            }
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+
+def get_embedding_batcher(embeddings: LocalEmbeddings, **kwargs) -> EmbeddingBatcher:
+    return EmbeddingBatcher(embeddings, **kwargs)
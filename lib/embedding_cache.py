@@ -0,0 +1,185 @@
+"""Persistent content-addressed cache for embedding vectors.
+
+Vectors are keyed by (model name, sha256 of text) and stored in a local
+SQLite file, fronted by an in-process LRU. The disk tier is size-bounded
+and evicts least recently used entries first.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        memory_items: int = 10000,
+        max_bytes: int = 512 * 1024 * 1024
+    ):
+        self.cache_dir = cache_dir or os.getenv(
+            "EMBEDDINGS_VECTOR_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "vectors")
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "embeddings.sqlite"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "model TEXT NOT NULL, digest TEXT NOT NULL, vector BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL, "
+            "PRIMARY KEY (model, digest))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON vectors (last_access)")
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM vectors").fetchone()[0]
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> Dict[int, np.ndarray]:
+        """Return cached vectors by input position; missing positions are absent."""
+        found: Dict[int, np.ndarray] = {}
+        pending: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (model_name, self.digest(text))
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = vector
+                    self.memory_hits += 1
+                else:
+                    pending.setdefault(key[1], []).append(i)
+
+            if pending:
+                digests = list(pending)
+                now = time.time()
+                for start in range(0, len(digests), 500):
+                    chunk = digests[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT digest, vector FROM vectors WHERE model = ? AND digest IN ({placeholders})",
+                        [model_name, *chunk]
+                    ).fetchall()
+                    for digest, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        self._remember((model_name, digest), vector)
+                        for i in pending.pop(digest):
+                            found[i] = vector
+                            self.disk_hits += 1
+                    if rows:
+                        self._conn.executemany(
+                            "UPDATE vectors SET last_access = ? WHERE model = ? AND digest = ?",
+                            [(now, model_name, digest) for digest, _ in rows]
+                        )
+                self._conn.commit()
+                self.misses += sum(len(positions) for positions in pending.values())
+
+        return found
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: np.ndarray):
+        now = time.time()
+        rows = []
+
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.ascontiguousarray(vector, dtype=np.float32)
+                digest = self.digest(text)
+                self._remember((model_name, digest), vector)
+                blob = vector.tobytes()
+                rows.append((model_name, digest, blob, len(blob), now))
+
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO vectors (model, digest, vector, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    row
+                )
+                if cursor.rowcount > 0:
+                    self._disk_bytes += row[3]
+            self._conn.commit()
+
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key: tuple, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        while self._disk_bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, digest, size FROM vectors ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+
+            victims = []
+            for model, digest, size in rows:
+                victims.append((model, digest))
+                self._disk_bytes -= size
+                if self._disk_bytes <= target:
+                    break
+
+            self._conn.executemany("DELETE FROM vectors WHERE model = ? AND digest = ?", victims)
+            self.evictions += len(victims)
+        self._conn.commit()
+
+    def clear(self, model_name: Optional[str] = None):
+        with self._lock:
+            if model_name:
+                self._conn.execute("DELETE FROM vectors WHERE model = ?", (model_name,))
+                for key in [k for k in self._memory if k[0] == model_name]:
+                    del self._memory[key]
+            else:
+                self._conn.execute("DELETE FROM vectors")
+                self._memory.clear()
+            self._conn.commit()
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM vectors").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_embedding_cache(cache_dir: Optional[str] = None, **kwargs) -> EmbeddingCache:
+    return EmbeddingCache(cache_dir=cache_dir, **kwargs)
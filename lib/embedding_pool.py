@@ -0,0 +1,125 @@
+"""Multi-process embedding pool for bulk ingestion.
+
+Each worker process loads the model once and pins its thread count.
+Texts are sharded across workers, and workers write vectors straight
+into a shared-memory buffer owned by the parent.
+"""
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+_worker_embeddings = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int):
+    global _worker_embeddings
+
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["EMBEDDINGS_ONNX_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if backend == "torch":
+        import torch
+        torch.set_num_threads(threads)
+
+    from lib.embeddings import LocalEmbeddings
+    _worker_embeddings = LocalEmbeddings(model_name=model_name, device="cpu", use_cache=False, backend=backend)
+
+
+def _encode_shard(task: Tuple[str, Tuple[int, int], int, List[str], Optional[int]]) -> int:
+    shm_name, shape, start, texts, token_budget = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        out[start:start + len(texts)] = _worker_embeddings.encode_array(texts, token_budget=token_budget)
+        del out
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class EmbeddingPool:
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        workers: Optional[int] = None,
+        threads_per_worker: int = 1,
+        backend: Optional[str] = None,
+        dimension: int = 384,
+        shard_size: int = 256
+    ):
+        self.model_name = model_name
+        self.workers = workers or int(os.getenv("EMBEDDINGS_WORKERS", "0")) or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.backend = backend or os.getenv("EMBEDDINGS_BACKEND", "torch")
+        self.dimension = dimension
+        self.shard_size = shard_size
+        self._pool = None
+
+        self.texts_encoded = 0
+        self.shards_encoded = 0
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            ctx = mp.get_context("spawn")
+            self._pool = ctx.Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.backend, self.threads_per_worker)
+            )
+        return self._pool
+
+    def encode_array(self, texts: List[str], token_budget: Optional[int] = None) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        shape = (len(texts), self.dimension)
+        shm = shared_memory.SharedMemory(create=True, size=len(texts) * self.dimension * 4)
+        try:
+            # small shards keep every worker busy when chunk lengths vary
+            shard_size = max(1, min(self.shard_size, -(-len(texts) // (self.workers * 4))))
+            tasks = [
+                (shm.name, shape, start, texts[start:start + shard_size], token_budget)
+                for start in range(0, len(texts), shard_size)
+            ]
+            for _ in self._ensure_pool().imap_unordered(_encode_shard, tasks):
+                self.shards_encoded += 1
+
+            result = np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.texts_encoded += len(texts)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "backend": self.backend,
+            "running": self._pool is not None,
+            "texts_encoded": self.texts_encoded,
+            "shards_encoded": self.shards_encoded
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def get_embedding_pool(model_name: str = "all-MiniLM-L6-v2", workers: Optional[int] = None, **kwargs) -> EmbeddingPool:
+    return EmbeddingPool(model_name=model_name, workers=workers, **kwargs)
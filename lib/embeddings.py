@@ -1,45 +1,168 @@
-"""Local embedding generation using sentence-transformers.
+"""Local embedding generation using sentence-transformers or ONNX Runtime.
 
 Provides embeddings without external API calls.
-Uses all-MiniLM-L6-v2 for CPU efficiency.
+Uses all-MiniLM-L6-v2 for CPU efficiency, loaded once per process via the model registry.
+Vectors are cached on disk by content hash; encode_array() returns float32 matrices.
 """
 
 import os
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
-import torch
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+from lib.embedding_cache import EmbeddingCache, get_embedding_cache
+from lib.model_registry import default_device, get_model_registry
 
 
 class LocalEmbeddings:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        use_cache: Optional[bool] = None,
+        backend: Optional[str] = None
+    ):
         self.model_name = model_name
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.backend = backend or os.getenv("EMBEDDINGS_BACKEND", "torch")
+        self.device = device or default_device(self.backend)
         self.model = self._load_model()
-        
-    def _load_model(self) -> SentenceTransformer:
-        cache_dir = os.getenv("EMBEDDINGS_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "embeddings"))
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        model = SentenceTransformer(self.model_name, cache_folder=cache_dir)
-        model.to(self.device)
-        return model
-    
+        self._cache_key = model_name if self.backend == "torch" else f"{model_name}@{self.backend}"
+        self.pool = None  # optional EmbeddingPool for large uncached batches
+
+        if use_cache is None:
+            use_cache = os.getenv("EMBEDDINGS_VECTOR_CACHE", "true").lower() == "true"
+        self.cache = (cache or get_embedding_cache()) if use_cache else None
+
+    def _load_model(self):
+        return get_model_registry().acquire(self.model_name, self.device, backend=self.backend)
+
+    def close(self):
+        if getattr(self, "model", None) is not None:
+            self.model = None
+            get_model_registry().release(self.model_name, self.device, backend=self.backend)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def encode(self, texts: List[str], batch_size: int = 32, show_progress: bool = False) -> List[List[float]]:
+        return self.encode_array(texts, batch_size=batch_size, show_progress=show_progress).tolist()
+
+    def encode_array(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress: bool = False,
+        token_budget: Optional[int] = None,
+        use_cache: bool = True
+    ) -> np.ndarray:
+        if self.cache is None or not use_cache:
+            return self._encode_uncached(texts, batch_size, show_progress, token_budget)
+
+        cached = self.cache.get_many(self._cache_key, texts)
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if i in cached:
+                matrix[i] = cached[i]
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            unique_texts = list(missing)
+            fresh = self._encode_uncached(unique_texts, batch_size, show_progress, token_budget)
+            self.cache.put_many(self._cache_key, unique_texts, fresh)
+            for text, vector in zip(unique_texts, fresh):
+                matrix[missing[text]] = vector
+
+        return matrix
+
+    def encode_bulk(self, texts: List[str], token_budget: Optional[int] = None, show_progress: bool = False) -> np.ndarray:
+        """Encode many texts in length-sorted batches capped by padded token count."""
+        token_budget = token_budget or int(os.getenv("EMBEDDINGS_TOKEN_BUDGET", "8192"))
+        return self.encode_array(texts, show_progress=show_progress, token_budget=token_budget)
+
+    def _encode_uncached(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress: bool,
+        token_budget: Optional[int] = None
+    ) -> np.ndarray:
+        if self.pool is not None and len(texts) >= self.pool.workers * 8:
+            return self.pool.encode_array(texts, token_budget=token_budget)
+
+        if token_budget and len(texts) > 1:
+            return self._encode_bucketed(texts, token_budget, show_progress)
+
         embeddings = self.model.encode(
             texts,
             batch_size=batch_size,
             show_progress_bar=show_progress,
             convert_to_numpy=True
         )
-        return embeddings.tolist()
-    
+        return embeddings.astype(np.float32, copy=False)
+
+    def _encode_bucketed(self, texts: List[str], token_budget: int, show_progress: bool) -> np.ndarray:
+        lengths = self.token_lengths(texts)
+        order = np.argsort(lengths, kind="stable")
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        for idx in order:
+            # sorted ascending, so the newest member is the batch's padded length
+            if batch and int(lengths[idx]) * (len(batch) + 1) > token_budget:
+                batches.append(batch)
+                batch = []
+            batch.append(int(idx))
+        if batch:
+            batches.append(batch)
+
+        if show_progress:
+            from tqdm.auto import tqdm
+            batches = tqdm(batches, desc="Batches")
+
+        for batch in batches:
+            embeddings = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            matrix[batch] = embeddings
+
+        return matrix
+
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        encoded = self.model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.model.max_seq_length,
+            return_attention_mask=False,
+            return_token_type_ids=False
+        )
+        return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
     def encode_single(self, text: str) -> List[float]:
         return self.encode([text])[0]
-    
+
+    def encode_single_array(self, text: str) -> np.ndarray:
+        return self.encode_array([text])[0]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+
     @property
     def dimension(self) -> int:
         return self.model.get_sentence_embedding_dimension()
 
 
-def get_embeddings(model_name: str = "all-MiniLM-L6-v2") -> LocalEmbeddings:
-    return LocalEmbeddings(model_name=model_name)
+def get_embeddings(model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None) -> LocalEmbeddings:
+    return LocalEmbeddings(model_name=model_name, backend=backend)
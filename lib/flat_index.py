@@ -0,0 +1,147 @@
+"""Exact in-memory search over a collection's vectors.
+
+Small or hot collections are answered from a contiguous float32 matrix
+with one matmul and argpartition instead of a Lance query. The index is
+loaded from the table once, then kept in sync with writes made through
+VectorStore. If the table version moves for any other reason (another
+process, compaction, index builds) it reloads on the next search. Every
+column of the table is held, so results carry the same fields as Lance's.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pyarrow as pa
+
+
+class FlatIndex:
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._clear(0)
+
+    def _clear(self, capacity: int):
+        self._vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+        self._norms = np.empty(capacity, dtype=np.float32)
+        self._ids: List[str] = []
+        self._fields: Dict[str, List[Any]] = {}  # non-vector columns, by name
+        self._positions: Dict[str, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, table):
+        """Replace the index contents with the current table."""
+        version = table.version
+        data = table.to_lance().to_table()
+        with self._lock:
+            self._clear(max(data.num_rows, 1024))
+            self._append(data)
+            self.version = version
+
+    def apply(self, batch: pa.RecordBatch, version: int, previous_version: Optional[int]) -> bool:
+        """Apply a write made through VectorStore. Returns False if the index is stale."""
+        with self._lock:
+            if self.version is None or self.version != previous_version:
+                self.version = None  # missed a write; reload on next search
+                return False
+            self._append(pa.Table.from_batches([batch]))
+            self.version = version
+            return True
+
+    def is_current(self, table) -> bool:
+        return self.version is not None and self.version == table.version
+
+    def covers(self, columns: List[str]) -> bool:
+        """True if every requested column is held by the index."""
+        with self._lock:
+            return all(column in ("id", "vector") or column in self._fields for column in columns)
+
+    def _append(self, data: pa.Table):
+        ids = data.column("id").to_pylist()
+        if not ids:
+            return
+        vectors = np.asarray(
+            data.column("vector").combine_chunks().flatten().to_numpy(zero_copy_only=False), dtype=np.float32
+        ).reshape(len(ids), self.dimension)
+        for name in data.column_names:
+            if name not in ("id", "vector") and name not in self._fields:
+                self._fields[name] = [None] * self._size
+        values = {
+            name: data.column(name).to_pylist() if name in data.column_names else [None] * len(ids)
+            for name in self._fields
+        }
+
+        for i, doc_id in enumerate(ids):
+            position = self._positions.get(doc_id)
+            if position is None:
+                position = self._size
+                if position == len(self._vectors):
+                    self._grow()
+                self._positions[doc_id] = position
+                self._ids.append(doc_id)
+                for name, column in values.items():
+                    self._fields[name].append(column[i])
+                self._size += 1
+            else:
+                for name, column in values.items():
+                    self._fields[name][position] = column[i]
+            self._vectors[position] = vectors[i]
+            self._norms[position] = float(vectors[i] @ vectors[i])
+
+    def _grow(self):
+        capacity = max(1024, len(self._vectors) * 2)
+        vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[:self._size] = self._norms[:self._size]
+        self._vectors, self._norms = vectors, norms
+
+    def search(self, query_vectors: np.ndarray, limit: int, columns: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Exact top-k by squared L2 distance, matching Lance's _distance.
+
+        Rows carry the requested columns plus _distance.
+        """
+        columns = columns or ["id", "text", "metadata"]
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        with self._lock:
+            # rows below n are never moved, so the views stay valid after the lock is released
+            n = self._size
+            vectors, norms = self._vectors[:n], self._norms[:n]
+            ids, fields = self._ids, dict(self._fields)
+        if n == 0:
+            return [[] for _ in queries]
+
+        distances = norms[None, :] - 2.0 * (queries @ vectors.T) + (queries * queries).sum(axis=1)[:, None]
+        k = min(limit, n)
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (len(queries), 1))
+
+        def getter(column: str):
+            if column == "id":
+                return ids.__getitem__
+            if column == "vector":
+                return lambda i: vectors[i].tolist()
+            return fields[column].__getitem__
+
+        getters = [(column, getter(column)) for column in columns if column != "_distance"]
+
+        results = []
+        for row, candidates in enumerate(top):
+            order = candidates[np.argsort(distances[row, candidates])]
+            results.append([
+                dict([(column, get(i)) for column, get in getters], _distance=float(max(distances[row, i], 0.0)))
+                for i in order
+            ])
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self._size,
+                "capacity": len(self._vectors),
+                "bytes": int(self._vectors.nbytes + self._norms.nbytes),
+                "version": self.version
+            }
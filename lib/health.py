@@ -58,15 +58,21 @@ class HealthMonitor:
         try:
             from lib.embeddings import get_embeddings
             
+            from lib.model_registry import get_model_registry
+            
             embeddings = get_embeddings()
-            test_embedding = embeddings.embed_query("test")
+            test_embedding = embeddings.encode_single("test")
             
-            return {
+            result = {
                 "status": "healthy",
                 "model": embeddings.model_name,
                 "dimension": embeddings.dimension,
-                "test_passed": len(test_embedding) == embeddings.dimension
+                "test_passed": len(test_embedding) == embeddings.dimension,
+                "cache": embeddings.cache_stats(),
+                "registry": get_model_registry().stats()
             }
+            embeddings.close()
+            return result
         except Exception as e:
             logger.error(f"Embeddings check failed: {e}")
             return {"status": "unhealthy", "error": str(e)}
@@ -92,6 +98,7 @@ class HealthMonitor:
             from lib.memory_layer import get_memory_layer
             
             memory = get_memory_layer()
+            memory.memory  # constructs mem0 Memory, which is otherwise deferred
             
             return {
                 "status": "healthy",
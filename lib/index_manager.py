@@ -0,0 +1,170 @@
+"""ANN index lifecycle for Lance collections.
+
+Builds an IVF_PQ (or configured) vector index once a collection crosses a
+row threshold, folds new rows into it as they accumulate, and retrains it
+from scratch when the collection has grown substantially since training.
+Scalar indexes keep key lookups on id and the typed filter columns cheap,
+and a full-text index on text serves BM25 search.
+"""
+
+import os
+import math
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from lib.metadata_filter import FILTER_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# VECTOR_INDEX_TYPE -> lancedb.index config class; PQ variants also take num_sub_vectors
+VECTOR_INDEX_CONFIGS = {
+    "IVF_FLAT": "IvfFlat",
+    "IVF_SQ": "IvfSq",
+    "IVF_PQ": "IvfPq",
+    "IVF_RQ": "IvfRq",
+    "IVF_HNSW_SQ": "IvfHnswSq",
+    "IVF_HNSW_PQ": "IvfHnswPq",
+    "IVF_HNSW_FLAT": "IvfHnswFlat"
+}
+SCALAR_INDEX_CONFIGS = {"BTREE": "BTree", "BITMAP": "Bitmap", "LABEL_LIST": "LabelList"}
+
+
+def _index_config(name: str, **kwargs):
+    from lancedb import index
+    return getattr(index, name)(**kwargs)
+
+
+class IndexManager:
+    def __init__(
+        self,
+        min_rows: Optional[int] = None,
+        rebuild_rows: Optional[int] = None,
+        index_type: Optional[str] = None,
+        background: Optional[bool] = None
+    ):
+        self.min_rows = min_rows or int(os.getenv("VECTOR_INDEX_MIN_ROWS", "100000"))
+        self.rebuild_rows = rebuild_rows or int(os.getenv("VECTOR_INDEX_REBUILD_ROWS", "50000"))
+        self.index_type = index_type or os.getenv("VECTOR_INDEX_TYPE", "IVF_PQ")
+        self.scalar_min_rows = int(os.getenv("VECTOR_SCALAR_INDEX_MIN_ROWS", "10000"))
+        if background is None:
+            background = os.getenv("VECTOR_INDEX_BACKGROUND", "true").lower() == "true"
+        self.background = background
+
+        self._lock = threading.Lock()
+        self._building: Dict[str, threading.Thread] = {}
+
+    def status(self, table) -> Dict[str, Any]:
+        rows = table.count_rows()
+        index_name = self.vector_index_name(table)
+        status = {"rows": rows, "indexed": index_name is not None, "index_name": index_name}
+
+        if index_name is not None:
+            stats = table.index_stats(index_name)
+            if stats is not None:
+                status.update({
+                    "index_type": stats.index_type,
+                    "indexed_rows": stats.num_indexed_rows,
+                    "unindexed_rows": stats.num_unindexed_rows
+                })
+        return status
+
+    def maybe_index(self, name: str, table, force: bool = False, wait: bool = False) -> Optional[str]:
+        """Build, extend or retrain the index if the policy says so. Returns the action taken."""
+        status = self.status(table)
+        if force or status["rows"] >= self.scalar_min_rows:
+            self.ensure_filter_indexes(table)
+
+        action = self._plan(status, force)
+        if action is None:
+            return None
+
+        with self._lock:
+            running = self._building.get(name)
+            if running is not None and running.is_alive():
+                return None
+            thread = threading.Thread(
+                target=self._run, args=(name, table, action, status), name=f"index-{name}", daemon=True
+            )
+            self._building[name] = thread
+            thread.start()
+
+        if wait or not self.background:
+            thread.join()
+        return action
+
+    def is_building(self, name: str) -> bool:
+        thread = self._building.get(name)
+        return thread is not None and thread.is_alive()
+
+    def wait(self, name: str):
+        thread = self._building.get(name)
+        if thread is not None:
+            thread.join()
+
+    def _plan(self, status: Dict[str, Any], force: bool) -> Optional[str]:
+        if not status["indexed"]:
+            return "create" if force or status["rows"] >= self.min_rows else None
+
+        unindexed = status.get("unindexed_rows", 0)
+        if not force and unindexed < self.rebuild_rows:
+            return None
+        # retrain when partitions were learned on less than two thirds of the current data
+        if unindexed * 2 > status.get("indexed_rows", 0):
+            return "retrain"
+        return "extend"
+
+    def _run(self, name: str, table, action: str, status: Dict[str, Any]):
+        try:
+            if action == "extend":
+                table.to_lance().optimize.optimize_indices()
+                table.checkout_latest()
+            else:
+                self._create(table, status["rows"])
+            logger.info(f"Vector index {action} finished for '{name}' ({status['rows']} rows)")
+        except Exception as e:
+            logger.error(f"Vector index {action} failed for '{name}': {e}")
+
+    def _create(self, table, rows: int):
+        dimension = table.schema.field("vector").type.list_size
+        num_sub_vectors = next(n for n in (dimension // 16, dimension // 8, dimension // 4, 1) if n and dimension % n == 0)
+
+        if self.index_type not in VECTOR_INDEX_CONFIGS:
+            raise ValueError(f"Unknown vector index type: {self.index_type}. Use one of {', '.join(VECTOR_INDEX_CONFIGS)}")
+        options = {"distance_type": "l2", "num_partitions": max(1, int(math.sqrt(rows)))}
+        if self.index_type.endswith("_PQ"):
+            options["num_sub_vectors"] = num_sub_vectors
+        table.create_index("vector", config=_index_config(VECTOR_INDEX_CONFIGS[self.index_type], **options), replace=True)
+
+    def ensure_scalar_index(self, table, column: str, index_type: str = "BTREE") -> bool:
+        """Create a scalar index on column if none exists. Returns True when one was built."""
+        if any(index.columns == [column] for index in table.list_indices()):
+            return False
+        table.create_index(column, config=_index_config(SCALAR_INDEX_CONFIGS[index_type]), replace=False)
+        return True
+
+    def ensure_filter_indexes(self, table) -> int:
+        """Index every typed filter column on the table that has no index yet."""
+        indexed = {tuple(index.columns) for index in table.list_indices()}
+        built = 0
+        for column, index_type in FILTER_COLUMNS.items():
+            if column in table.schema.names and (column,) not in indexed:
+                table.create_index(column, config=_index_config(SCALAR_INDEX_CONFIGS[index_type]), replace=False)
+                built += 1
+        return built
+
+    def ensure_fts_index(self, table, column: str = "text") -> bool:
+        if any(index.columns == [column] and index.index_type == "FTS" for index in table.list_indices()):
+            return False
+        table.create_index(column, config=_index_config("FTS"), replace=False)
+        return True
+
+    def vector_index_name(self, table) -> Optional[str]:
+        for index in table.list_indices():
+            if "vector" in index.columns:
+                return index.name
+        return None
+
+
+def get_index_manager(**kwargs) -> IndexManager:
+    return IndexManager(**kwargs)
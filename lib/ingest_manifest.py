@@ -0,0 +1,139 @@
+"""Per-file manifest for incremental re-ingestion.
+
+Records path, size, mtime, content hash and the chunk ids stored for each
+ingested file, per collection, in a local SQLite file. A re-run compares
+size and mtime first and only hashes files whose stat changed, so
+unchanged files are skipped without being read. Chunk ids are content
+hashes and may be shared by several files, so a chunk is only deleted
+once no file in the collection references it.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "collection TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL, chunk_ids TEXT NOT NULL, "
+            "ingested_at REAL NOT NULL, PRIMARY KEY (collection, path))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "collection TEXT NOT NULL, chunk_id TEXT NOT NULL, path TEXT NOT NULL, "
+            "PRIMARY KEY (collection, chunk_id, path))"
+        )
+        self._conn.commit()
+
+    def get(self, collection: str, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, chunk_ids, ingested_at FROM files WHERE collection = ? AND path = ?",
+                (collection, path)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "path": path,
+            "size": row[0],
+            "mtime_ns": row[1],
+            "digest": row[2],
+            "chunk_ids": json.loads(row[3]),
+            "ingested_at": row[4]
+        }
+
+    def is_unchanged(self, entry: Optional[Dict[str, Any]], stat: os.stat_result) -> bool:
+        return entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def put(self, collection: str, path: str, stat: os.stat_result, digest: str, chunk_ids: List[str]):
+        chunk_ids = list(dict.fromkeys(chunk_ids))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (collection, path, size, mtime_ns, digest, chunk_ids, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (collection, path, stat.st_size, stat.st_mtime_ns, digest, json.dumps(chunk_ids), time.time())
+            )
+            self._conn.execute("DELETE FROM chunks WHERE collection = ? AND path = ?", (collection, path))
+            self._conn.executemany(
+                "INSERT INTO chunks (collection, chunk_id, path) VALUES (?, ?, ?)",
+                [(collection, chunk_id, path) for chunk_id in chunk_ids]
+            )
+            self._conn.commit()
+
+    def touch(self, collection: str, path: str, stat: os.stat_result):
+        """Record a new size/mtime for a file whose content hash did not change."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE collection = ? AND path = ?",
+                (stat.st_size, stat.st_mtime_ns, collection, path)
+            )
+            self._conn.commit()
+
+    def remove(self, collection: str, path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE collection = ? AND path = ?", (collection, path))
+            self._conn.execute("DELETE FROM chunks WHERE collection = ? AND path = ?", (collection, path))
+            self._conn.commit()
+
+    def paths(self, collection: str, prefix: Optional[str] = None) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM files WHERE collection = ?", (collection,)).fetchall()
+        paths = [row[0] for row in rows]
+        if prefix is not None:
+            paths = [path for path in paths if path.startswith(prefix)]
+        return paths
+
+    def unreferenced(self, collection: str, chunk_ids: Iterable[str]) -> List[str]:
+        """The chunk ids no file in the collection still references."""
+        chunk_ids = list(dict.fromkeys(chunk_ids))
+        referenced = set()
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                chunk = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT DISTINCT chunk_id FROM chunks WHERE collection = ? AND chunk_id IN ({placeholders})",
+                    [collection, *chunk]
+                ).fetchall()
+                referenced.update(row[0] for row in rows)
+        return [chunk_id for chunk_id in chunk_ids if chunk_id not in referenced]
+
+    def stats(self, collection: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if collection:
+                files = self._conn.execute("SELECT COUNT(*) FROM files WHERE collection = ?", (collection,)).fetchone()[0]
+                chunks = self._conn.execute(
+                    "SELECT COUNT(DISTINCT chunk_id) FROM chunks WHERE collection = ?", (collection,)
+                ).fetchone()[0]
+            else:
+                files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+                chunks = self._conn.execute("SELECT COUNT(DISTINCT chunk_id) FROM chunks").fetchone()[0]
+        return {"path": self.path, "files": files, "chunks": chunks}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_ingest_manifest(path: Optional[str] = None) -> IngestManifest:
+    path = path or os.getenv("INGEST_MANIFEST_PATH") or os.path.join(
+        os.getenv("VECTOR_DB_PATH", "./data/vectors"), "ingest_manifest.sqlite"
+    )
+    return IngestManifest(path)
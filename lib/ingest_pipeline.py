@@ -0,0 +1,385 @@
+"""Staged, streaming ingest pipeline.
+
+Files flow through four stages connected by bounded queues:
+
+    read   stream each file in blocks, hash and decode it
+    chunk  cut the stream into chunks as it arrives (RAGEngine.get_chunker)
+    embed  skip stored chunk ids, encode the rest
+    write  batch rows by count or bytes and upsert them
+
+Each stage runs on its own threads, so reading and parsing overlap with
+embedding and writing, and a full queue slows the stage feeding it
+instead of buffering whole files. Large files are never held in memory
+at once. A file is recorded in the ingest manifest once all its chunks
+are written; stale chunks are deleted after the run.
+"""
+
+import os
+import time
+import queue
+import codecs
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.starved = 0.0  # waiting on an empty input queue
+        self.blocked = 0.0  # waiting on a full output queue (backpressure)
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def add(self, **values):
+        with self._lock:
+            for key, value in values.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def observe_queue(self, depth: int):
+        with self._lock:
+            self.max_queue = max(self.max_queue, depth)
+
+    def report(self, seconds: float) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "items": self.items,
+                "bytes": self.bytes,
+                "items_per_second": round(self.items / seconds, 1) if seconds else 0.0,
+                "mb_per_second": round(self.bytes / seconds / 1024 / 1024, 2) if seconds else 0.0,
+                "busy_seconds": round(self.busy, 3),
+                "starved_seconds": round(self.starved, 3),
+                "blocked_seconds": round(self.blocked, 3),
+                "max_queue": self.max_queue
+            }
+
+
+class FileJob:
+    def __init__(self, seq: int, path: Path, key: str, stat: os.stat_result, entry: Optional[Dict[str, Any]], metadata: Dict[str, Any]):
+        self.seq = seq
+        self.path = path
+        self.key = key
+        self.stat = stat
+        self.entry = entry
+        self.metadata = metadata
+        self.digest: Optional[str] = None
+        self.chunk_ids: List[str] = []
+        self.failed = False
+        self.window = None  # streaming chunker, owned by one chunk worker
+        self._outstanding = 1  # held by the chunk stage until the file is fully chunked
+        self._lock = threading.Lock()
+
+    def hold(self):
+        with self._lock:
+            self._outstanding += 1
+
+    def release(self) -> bool:
+        """Drop one hold; True when the file is fully written."""
+        with self._lock:
+            self._outstanding -= 1
+            return self._outstanding == 0
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        engine,
+        read_workers: Optional[int] = None,
+        chunk_workers: Optional[int] = None,
+        embed_workers: Optional[int] = None,
+        write_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        embed_batch: Optional[int] = None,
+        write_rows: Optional[int] = None,
+        write_bytes: Optional[int] = None,
+        block_bytes: Optional[int] = None
+    ):
+        self.engine = engine
+        self.read_workers = read_workers or int(os.getenv("INGEST_READ_WORKERS", "2"))
+        self.chunk_workers = chunk_workers or int(os.getenv("INGEST_CHUNK_WORKERS", "2"))
+        self.embed_workers = embed_workers or int(os.getenv("INGEST_EMBED_WORKERS", "1"))
+        self.write_workers = write_workers or int(os.getenv("INGEST_WRITE_WORKERS", "1"))
+        self.queue_size = queue_size or int(os.getenv("INGEST_QUEUE_SIZE", "64"))
+        self.embed_batch = embed_batch or int(os.getenv("INGEST_EMBED_BATCH", "256"))
+        self.write_rows = write_rows or int(os.getenv("INGEST_WRITE_ROWS", "4096"))
+        self.write_bytes = write_bytes or int(os.getenv("INGEST_WRITE_BYTES", str(32 * 1024 * 1024)))
+        self.block_bytes = block_bytes or int(os.getenv("INGEST_BLOCK_BYTES", str(1024 * 1024)))
+        self.flush_seconds = 0.5
+
+    def run(
+        self,
+        paths: Iterable[Path],
+        metadata: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self._metadata = metadata
+        self._chunker = self.engine.get_chunker(chunk_size, overlap)
+        self._force = force
+        self._stale: List[str] = []
+        self._commit_lock = threading.Lock()
+        self._totals = {"files": 0, "unchanged": 0, "chunks": 0, "skipped": 0, "removed": 0, "failed": []}
+        self._totals_lock = threading.Lock()
+        self._stats = {
+            name: StageStats(name, workers) for name, workers in (
+                ("read", self.read_workers), ("chunk", self.chunk_workers),
+                ("embed", self.embed_workers), ("write", self.write_workers)
+            )
+        }
+
+        self._paths: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # one queue per chunk worker, so a file's blocks stay in order on one thread
+        self._chunk_queues = [queue.Queue(maxsize=self.queue_size) for _ in range(self.chunk_workers)]
+        self._embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        stages = [
+            (self._start(self._read_worker, "read"), [self._paths] * self.read_workers),
+            (self._start(self._chunk_worker, "chunk", self._chunk_queues), self._chunk_queues),
+            (self._start(self._embed_worker, "embed"), [self._embed_queue] * self.embed_workers),
+            (self._start(self._write_worker, "write"), [self._write_queue] * self.write_workers)
+        ]
+
+        for seq, path in enumerate(paths):
+            self._paths.put((seq, path))
+
+        # stop stages in order, so each one drains before the next is told to stop
+        for threads, inboxes in stages:
+            for inbox in inboxes:
+                inbox.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        if self._stale:
+            self._totals["removed"] += self.engine._delete_chunks(self._stale)
+
+        seconds = time.perf_counter() - start
+        totals = dict(self._totals)
+        totals["seconds"] = round(seconds, 3)
+        totals["stages"] = {name: stats.report(seconds) for name, stats in self._stats.items()}
+        return totals
+
+    def _start(self, target, name: str, inboxes: Optional[List[queue.Queue]] = None) -> List[threading.Thread]:
+        threads = []
+        for i in range(self._stats[name].workers):
+            args = (inboxes[i],) if inboxes else ()
+            thread = threading.Thread(target=target, args=args, name=f"ingest-{name}-{i}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _get(self, q: queue.Queue, stats: StageStats, timeout: Optional[float] = None):
+        waited = time.perf_counter()
+        try:
+            return q.get(timeout=timeout)
+        finally:
+            stats.add(starved=time.perf_counter() - waited)
+
+    def _put(self, q: queue.Queue, item, stats: StageStats) -> float:
+        """Put with backpressure accounting; returns the seconds spent blocked."""
+        waited = time.perf_counter()
+        q.put(item)
+        blocked = time.perf_counter() - waited
+        stats.add(blocked=blocked)
+        stats.observe_queue(q.qsize())
+        return blocked
+
+    def _fail(self, stage: str, error: Exception, path: Optional[Path] = None):
+        logger.error(f"Ingest {stage} stage failed{f' on {path}' if path else ''}: {error}")
+        with self._totals_lock:
+            self._totals["failed"].append({"stage": stage, "path": str(path) if path else None, "error": str(error)})
+
+    def _count(self, **values):
+        with self._totals_lock:
+            for key, value in values.items():
+                self._totals[key] += value
+
+    def _read_worker(self):
+        stats = self._stats["read"]
+        manifest = self.engine.manifest
+        collection = self.engine.collection_name
+        while True:
+            item = self._get(self._paths, stats)
+            if item is _DONE:
+                return
+            seq, path = item
+            began = time.perf_counter()
+            key = str(path.absolute())
+            try:
+                stat = path.stat()
+                entry = manifest.get(collection, key)
+                if not self._force and manifest.is_unchanged(entry, stat):
+                    self._count(unchanged=1)
+                    continue
+            except OSError as e:
+                self._fail("read", e, path)
+                continue
+
+            job = FileJob(seq, path, key, stat, entry, self.engine._file_metadata(path, dict(self._metadata or {})))
+            target = self._chunk_queues[seq % self.chunk_workers]
+            blocked = self._put(target, ("start", job, None), stats)
+            blocked += self._stream(job, target, stats)
+            blocked += self._put(target, ("end", job, None), stats)
+            stats.add(items=1, busy=time.perf_counter() - began - blocked)
+
+    def _stream(self, job: FileJob, target: queue.Queue, stats: StageStats) -> float:
+        blocked = 0.0
+        digest = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        carry = ""
+        try:
+            with open(job.path, "rb") as f:
+                while True:
+                    block = f.read(self.block_bytes)
+                    final = not block
+                    digest.update(block)
+                    text = carry + decoder.decode(block, final=final)
+                    if final:
+                        carry = ""
+                    else:
+                        # cut at the last whitespace so no word spans two blocks
+                        cut = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t"), text.rfind("\r"))
+                        text, carry = (text[:cut + 1], text[cut + 1:]) if cut >= 0 else ("", text)
+                    if text:
+                        blocked += self._put(target, ("text", job, text), stats)
+                    stats.add(bytes=len(block))
+                    if final:
+                        break
+        except (OSError, UnicodeDecodeError) as e:
+            job.failed = True
+            self._fail("read", e, job.path)
+            return blocked
+        job.digest = digest.hexdigest()
+        return blocked
+
+    def _chunk_worker(self, inbox: queue.Queue):
+        stats = self._stats["chunk"]
+        while True:
+            item = self._get(inbox, stats)
+            if item is _DONE:
+                return
+            kind, job, text = item
+            began = time.perf_counter()
+            try:
+                if kind == "start":
+                    job.window = self._chunker.stream()
+                    continue
+                chunks = job.window.feed(text) if kind == "text" else job.window.finish()
+                blocked = sum(
+                    self._emit(job, chunks[offset:offset + self.embed_batch], stats)
+                    for offset in range(0, len(chunks), self.embed_batch)
+                )
+                stats.add(items=len(chunks), bytes=len(text) if text else 0, busy=time.perf_counter() - began - blocked)
+                if kind == "end":
+                    job.window = None
+                    self._release(job)
+            except Exception as e:
+                self._fail("chunk", e, job.path)
+                job.failed = True
+                if kind == "end":
+                    self._release(job)
+
+    def _emit(self, job: FileJob, chunks: List[str], stats: StageStats) -> float:
+        ids = [self.engine._generate_id(chunk) for chunk in chunks]
+        job.chunk_ids.extend(ids)
+        job.hold()
+        return self._put(self._embed_queue, (job, ids, chunks), stats)
+
+    def _embed_worker(self):
+        stats = self._stats["embed"]
+        store = self.engine.vector_store
+        collection = self.engine.collection_name
+        while True:
+            item = self._get(self._embed_queue, stats)
+            if item is _DONE:
+                return
+            job, ids, chunks = item
+            began = time.perf_counter()
+            try:
+                existing = store.existing_ids(collection, ids)
+                new = list({chunk_id: i for i, chunk_id in enumerate(ids) if chunk_id not in existing}.values())
+                self._count(chunks=len(ids), skipped=len(ids) - len(new))
+                if not new:
+                    self._release(job)
+                    continue
+                texts = [chunks[i] for i in new]
+                vectors = self.engine.embeddings.encode_bulk(texts)
+                stats.add(items=len(texts), bytes=sum(len(text) for text in texts), busy=time.perf_counter() - began)
+                self._put(self._write_queue, (job, [ids[i] for i in new], texts, vectors), stats)
+            except Exception as e:
+                self._fail("embed", e, job.path)
+                job.failed = True
+                self._release(job)
+
+    def _write_worker(self):
+        stats = self._stats["write"]
+        pending: List[tuple] = []
+        rows = 0
+        size = 0
+        while True:
+            try:
+                item = self._get(self._write_queue, stats, timeout=self.flush_seconds if pending else None)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _DONE:
+                job, ids, texts, vectors = item
+                pending.append(item)
+                rows += len(ids)
+                size += vectors.nbytes + sum(len(text) for text in texts)
+            if pending and (item is None or item is _DONE or rows >= self.write_rows or size >= self.write_bytes):
+                self._flush(pending, rows, size, stats)
+                pending, rows, size = [], 0, 0
+            if item is _DONE:
+                return
+
+    def _flush(self, pending: List[tuple], rows: int, size: int, stats: StageStats):
+        began = time.perf_counter()
+        try:
+            self.engine.vector_store.upsert_documents(
+                collection_name=self.engine.collection_name,
+                ids=[chunk_id for _, ids, _, _ in pending for chunk_id in ids],
+                texts=[text for _, _, texts, _ in pending for text in texts],
+                vectors=np.concatenate([vectors for _, _, _, vectors in pending]),
+                metadatas=[job.metadata for job, ids, _, _ in pending for _ in ids]
+            )
+            stats.add(items=rows, bytes=size, busy=time.perf_counter() - began)
+        except Exception as e:
+            self._fail("write", e)
+            for job, _, _, _ in pending:
+                job.failed = True
+        for job, _, _, _ in pending:
+            self._release(job)
+
+    def _release(self, job: FileJob):
+        if not job.release():
+            return
+        with self._commit_lock:
+            if job.failed or job.digest is None:
+                # chunks already written for a failed file are dropped unless another file uses them
+                self._stale.extend(job.chunk_ids)
+                return
+            self.engine.manifest.put(self.engine.collection_name, job.key, job.stat, job.digest, job.chunk_ids)
+            if job.entry is not None:
+                self._stale.extend(set(job.entry["chunk_ids"]) - set(job.chunk_ids))
+        # a touched file with the same content was re-read, but nothing was embedded for it
+        unchanged = job.entry is not None and job.entry["digest"] == job.digest
+        self._count(**{"unchanged" if unchanged else "files": 1})
+
+
+def get_ingest_pipeline(engine, **kwargs) -> IngestPipeline:
+    return IngestPipeline(engine, **kwargs)
@@ -1,6 +1,7 @@
 """LLM provider abstraction supporting Anthropic and Ollama.
 
 Enables switching between cloud (Claude) and local (Ollama) models.
+SDK clients are created on first request.
 """
 
 import os
@@ -22,12 +23,17 @@ class AnthropicProvider(LLMProvider):
     def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514"):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.model = model
-        
-        try:
-            from anthropic import Anthropic
-            self.client = Anthropic(api_key=self.api_key)
-        except ImportError:
-            raise ImportError("Install anthropic: pip install anthropic")
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                from anthropic import Anthropic
+                self._client = Anthropic(api_key=self.api_key)
+            except ImportError:
+                raise ImportError("Install anthropic: pip install anthropic")
+        return self._client
     
     def generate(self, prompt: str, **kwargs) -> str:
         messages = [{"role": "user", "content": prompt}]
@@ -47,12 +53,17 @@ class OllamaProvider(LLMProvider):
     def __init__(self, base_url: Optional[str] = None, model: str = "llama3.3"):
         self.base_url = base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
         self.model = model
-        
-        try:
-            import ollama
-            self.client = ollama.Client(host=self.base_url)
-        except ImportError:
-            raise ImportError("Install ollama: pip install ollama")
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import ollama
+                self._client = ollama.Client(host=self.base_url)
+            except ImportError:
+                raise ImportError("Install ollama: pip install ollama")
+        return self._client
     
     def generate(self, prompt: str, **kwargs) -> str:
         response = self.client.generate(
@@ -0,0 +1,29 @@
+"""mem0 embedder backed by the shared model registry.
+
+Loaded by mem0's EmbedderFactory through its dotted path, so mem0 is only
+imported when a MemoryLayer actually builds its Memory.
+"""
+
+import os
+
+from mem0.embeddings.base import EmbeddingBase
+from mem0.embeddings.huggingface import HuggingFaceEmbedding
+
+from lib.model_registry import get_model_registry
+
+
+class SharedHuggingFaceEmbedding(HuggingFaceEmbedding):
+    """mem0 huggingface embedder that takes its model from the shared registry."""
+    
+    def __init__(self, config=None):
+        EmbeddingBase.__init__(self, config)
+        
+        if self.config.huggingface_base_url or self.config.model_kwargs:
+            super().__init__(config)
+            return
+        
+        self.config.model = self.config.model or "multi-qa-MiniLM-L6-cos-v1"
+        # same backend as LocalEmbeddings, so an onnx process never loads torch for mem0
+        backend = os.getenv("EMBEDDINGS_BACKEND", "torch")
+        self.model = get_model_registry().acquire(self.config.model, backend=backend)
+        self.config.embedding_dims = self.config.embedding_dims or self.model.get_sentence_embedding_dimension()
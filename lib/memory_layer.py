@@ -2,17 +2,35 @@
 
 Integrates with mem0 for user, session, and agent memory.
 Supports local and cloud modes.
+The local huggingface embedder shares its model with LocalEmbeddings.
+mem0 is imported and Memory constructed on first use.
 """
 
 import os
+import threading
 from typing import List, Dict, Any, Optional
-from mem0 import Memory
+
+
+def use_shared_embedder():
+    from mem0.utils.factory import EmbedderFactory
+    EmbedderFactory.provider_to_class["huggingface"] = "lib.mem0_embedder.SharedHuggingFaceEmbedding"
 
 
 class MemoryLayer:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or self._default_config()
-        self.memory = Memory(config=self.config)
+        self._memory = None
+        self._lock = threading.Lock()
+    
+    @property
+    def memory(self):
+        if self._memory is None:
+            with self._lock:
+                if self._memory is None:
+                    from mem0 import Memory
+                    use_shared_embedder()
+                    self._memory = Memory(config=self.config)
+        return self._memory
     
     def _default_config(self) -> Dict[str, Any]:
         use_local = os.getenv("MEM0_USE_LOCAL", "true").lower() == "true"
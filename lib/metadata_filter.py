@@ -0,0 +1,176 @@
+"""Compile metadata filters into Lance SQL predicates.
+
+Common metadata fields are stored as typed columns (FILTER_COLUMNS) with
+scalar indexes, so filters on them can be answered from the index. Other
+keys fall back to matching the JSON metadata column (the same key inside
+a nested object can also match).
+
+Filter values:
+    "md"                         equality
+    ["md", "py"]                 IN
+    {"$gte": 1, "$lt": 5}        range ($gt, $gte, $lt, $lte)
+    {"$prefix": "rag_"}          prefix match
+    {"$eq": "md"}, {"$in": [...]} explicit forms
+    None                         IS NULL
+
+Numeric range bounds compare values as numbers, on typed columns and on
+top-level JSON keys (e.g. {"page": {"$gte": 10}}); values that are not
+numbers never match. String bounds compare lexicographically and are
+only supported on typed columns.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+
+# typed filter column -> scalar index type
+FILTER_COLUMNS: Dict[str, str] = {
+    "filename": "BTREE",
+    "type": "BITMAP",
+    "extension": "BITMAP",
+    "language": "BITMAP",
+    "user": "BITMAP"
+}
+
+RANGE_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+OPERATORS = set(RANGE_OPERATORS) | {"$eq", "$in", "$prefix"}
+
+
+def sql_literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'{}'".format(value.replace("'", "''"))
+    raise ValueError(f"Unsupported filter value: {value!r}")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _regex_literal(value: str) -> str:
+    return "".join("\\" + c if c in "\\.^$|?*+()[]{}" else c for c in value)
+
+
+def _like_literal(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("'", "''")
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    # smallest string greater than every string starting with prefix
+    for i in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[i]) < 0x10FFFF:
+            return prefix[:i] + chr(ord(prefix[i]) + 1)
+    return None
+
+
+def _normalize(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        unknown = set(value) - OPERATORS
+        if unknown:
+            raise ValueError(f"Unknown filter operators: {', '.join(sorted(unknown))}")
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return {"$in": list(value)}
+    return {"$eq": value}
+
+
+def _column_predicates(column: str, conditions: Dict[str, Any]) -> List[str]:
+    ident = f"`{column}`"
+    predicates = []
+
+    def literal(value: Any) -> str:
+        return sql_literal(str(value))  # typed columns hold str() of the metadata value
+
+    for op, value in conditions.items():
+        if op == "$eq":
+            predicates.append(f"{ident} IS NULL" if value is None else f"{ident} = {literal(value)}")
+        elif op == "$in":
+            if not value:
+                predicates.append("FALSE")
+            else:
+                predicates.append(f"{ident} IN ({', '.join(literal(v) for v in value)})")
+        elif op == "$prefix":
+            if not isinstance(value, str):
+                raise ValueError(f"$prefix needs a string, got {value!r}")
+            # a range keeps the predicate answerable from the scalar index
+            upper = _prefix_upper_bound(value)
+            predicates.append(f"{ident} >= {literal(value)}")
+            if upper is not None:
+                predicates.append(f"{ident} < {literal(upper)}")
+        elif _is_number(value):
+            # typed columns are strings; compare numerically, not as "10" < "9"
+            predicates.append(f"TRY_CAST({ident} AS DOUBLE) {RANGE_OPERATORS[op]} {sql_literal(value)}")
+        else:
+            predicates.append(f"{ident} {RANGE_OPERATORS[op]} {literal(value)}")
+    return predicates
+
+
+def _json_predicates(key: str, conditions: Dict[str, Any]) -> List[str]:
+    def like(pattern: str) -> str:
+        return "metadata LIKE '%{}' ESCAPE '\\'".format(pattern)
+
+    def number(key: str) -> str:
+        # the numeric value of a top-level key in the json.dumps(sort_keys=True) text
+        pattern = '[{,] ?' + _regex_literal(json.dumps(key)) + ': (-?[0-9][0-9.eE+-]*)'
+        return f"regexp_match(metadata, {sql_literal(pattern)})[1]"
+
+    def contains(value: Any) -> str:
+        pair = _like_literal(json.dumps({key: value}, sort_keys=True)[1:-1])
+        if isinstance(value, str):
+            return like(pair + "%")
+        # bound non-string values so 5 does not match 50
+        return f"({like(pair + ',%')} OR {like(pair + '}')})"
+
+    predicates = []
+    for op, value in conditions.items():
+        if op == "$eq":
+            predicates.append(contains(value))
+        elif op == "$in":
+            predicates.append("(" + " OR ".join(contains(v) for v in value) + ")" if value else "FALSE")
+        elif op == "$prefix":
+            if not isinstance(value, str):
+                raise ValueError(f"$prefix needs a string, got {value!r}")
+            pair = json.dumps({key: value}, sort_keys=True)[1:-2]  # drop the closing quote
+            predicates.append(like(_like_literal(pair) + "%"))
+        elif _is_number(value):
+            predicates.append(f"TRY_CAST({number(key)} AS DOUBLE) {RANGE_OPERATORS[op]} {sql_literal(value)}")
+        else:
+            raise ValueError(
+                f"String range filters ({op}) need a typed column; '{key}' is not one of "
+                f"{', '.join(FILTER_COLUMNS)}. Numeric bounds work on any key."
+            )
+    return predicates
+
+
+def compile_filter(filter_metadata: Optional[Dict[str, Any]], columns: Optional[set] = None) -> Optional[str]:
+    """Compile a filter dict into a SQL predicate, or None for no filter.
+
+    columns limits which typed columns exist on the target table; keys
+    outside it are matched against the JSON metadata column.
+    """
+    if not filter_metadata:
+        return None
+
+    columns = set(FILTER_COLUMNS) if columns is None else columns
+    predicates = []
+    for key, value in filter_metadata.items():
+        conditions = _normalize(value)
+        if key in columns:
+            predicates.extend(_column_predicates(key, conditions))
+        else:
+            predicates.extend(_json_predicates(key, conditions))
+    return " AND ".join(predicates)
+
+
+def filter_values(metadata: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Values of the typed filter columns for one metadata dict."""
+    return {
+        column: None if metadata.get(column) is None else str(metadata[column])
+        for column in FILTER_COLUMNS
+    }
@@ -0,0 +1,164 @@
+"""Process-wide registry of loaded embedding models.
+
+Every component asking for the same (model, device, backend) shares one
+loaded encoder. Models are loaded lazily on first acquire, reference
+counted, and optionally unloaded after sitting idle. torch is only
+imported when the torch backend is used.
+"""
+
+import os
+import gc
+import sys
+import time
+import threading
+from typing import Dict, Any, Optional, Tuple, Callable
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.model = None
+        self.refs = 0
+        self.loads = 0
+        self.idle_since: Optional[float] = None
+
+
+def default_device(backend: str = "torch") -> str:
+    if backend != "torch":
+        return "cpu"
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def canonical_model_name(model_name: str) -> str:
+    prefix = "sentence-transformers/"
+    return model_name[len(prefix):] if model_name.startswith(prefix) else model_name
+
+
+def load_sentence_transformer(model_name: str, device: str):
+    from sentence_transformers import SentenceTransformer
+
+    cache_dir = os.getenv("EMBEDDINGS_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "embeddings"))
+    os.makedirs(cache_dir, exist_ok=True)
+
+    model = SentenceTransformer(model_name, cache_folder=cache_dir)
+    model.to(device)
+    return model
+
+
+def load_model(model_name: str, device: str, backend: str = "torch"):
+    if backend == "torch":
+        return load_sentence_transformer(model_name, device)
+
+    from lib.onnx_backend import BACKENDS, load_onnx_encoder
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported embeddings backend: {backend}. Use one of {', '.join(BACKENDS)}")
+    return load_onnx_encoder(model_name, quantize=backend == "onnx-int8").to(device)
+
+
+class ModelRegistry:
+    def __init__(self, idle_timeout: Optional[float] = None):
+        if idle_timeout is None:
+            idle_timeout = float(os.getenv("EMBEDDINGS_IDLE_UNLOAD_SECONDS", "0"))
+        self.idle_timeout = idle_timeout  # 0 keeps unreferenced models loaded
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, str], _Entry] = {}
+
+    def _key(self, model_name: str, device: Optional[str], backend: str) -> Tuple[str, str, str]:
+        return canonical_model_name(model_name), device or default_device(backend), backend
+
+    def acquire(
+        self,
+        model_name: str,
+        device: Optional[str] = None,
+        backend: str = "torch",
+        loader: Optional[Callable[[str, str], Any]] = None
+    ):
+        key = self._key(model_name, device, backend)
+
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refs += 1
+            entry.idle_since = None
+
+        try:
+            with entry.lock:
+                if entry.model is None:
+                    if loader is not None:
+                        entry.model = loader(model_name, key[1])
+                    else:
+                        entry.model = load_model(model_name, key[1], backend)
+                    entry.loads += 1
+                return entry.model
+        except Exception:
+            self.release(model_name, device, backend)
+            raise
+
+    def release(self, model_name: str, device: Optional[str] = None, backend: str = "torch"):
+        key = self._key(model_name, device, backend)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs == 0:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            entry.idle_since = time.monotonic()
+
+        if self.idle_timeout > 0:
+            timer = threading.Timer(self.idle_timeout, self.unload_idle)
+            timer.daemon = True
+            timer.start()
+
+    def unload_idle(self, max_idle: Optional[float] = None) -> int:
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        unloaded = 0
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.refs == 0 and entry.idle_since is not None and now - entry.idle_since >= max_idle:
+                    with entry.lock:
+                        entry.model = None
+                    del self._entries[key]
+                    unloaded += 1
+
+        if unloaded:
+            gc.collect()
+            torch = sys.modules.get("torch")
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        return unloaded
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "idle_timeout": self.idle_timeout,
+                "models": [
+                    {
+                        "model": key[0],
+                        "device": key[1],
+                        "backend": key[2],
+                        "loaded": entry.model is not None,
+                        "refs": entry.refs,
+                        "loads": entry.loads,
+                        "idle_seconds": round(now - entry.idle_since, 1) if entry.idle_since is not None else 0.0
+                    }
+                    for key, entry in self._entries.items()
+                ]
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,149 @@
+"""ONNX Runtime backend for sentence-transformers models.
+
+Runs the exported ONNX graph of a sentence-transformers model on CPU
+without importing torch, with optional int8 dynamic quantization.
+Pooling and normalization follow the model's own sentence-transformers
+config, so vectors stay compatible with the PyTorch backend.
+"""
+
+import os
+import json
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _repo_id(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def _read_json(path: str) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _TokenizerAdapter:
+    """Callable subset of the transformers tokenizer API used by LocalEmbeddings."""
+
+    def __init__(self, tokenizer, max_seq_length: int):
+        tokenizer.no_padding()
+        self._untruncated = tokenizer.__class__.from_str(tokenizer.to_str())  # for chunking whole texts
+        self._untruncated.no_truncation()
+        tokenizer.enable_truncation(max_seq_length)
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+
+    def __call__(self, texts: List[str], add_special_tokens: bool = True, **kwargs) -> Dict[str, Any]:
+        encodings = self.tokenizer.encode_batch(texts, add_special_tokens=add_special_tokens)
+        return {"input_ids": [encoding.ids for encoding in encodings]}
+
+    def encode_offsets(self, text: str) -> Tuple[List[Tuple[int, int]], List[Optional[int]]]:
+        encoding = self._untruncated.encode(text, add_special_tokens=False)
+        return encoding.offsets, encoding.word_ids
+
+
+class OnnxSentenceEncoder:
+    def __init__(self, model_name: str, quantize: bool = False, cache_dir: Optional[str] = None, threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+            from huggingface_hub import hf_hub_download
+        except ImportError:
+            raise ImportError("Install ONNX backend: pip install onnxruntime tokenizers huggingface_hub")
+
+        self.model_name = model_name
+        self.cache_dir = cache_dir or os.getenv("EMBEDDINGS_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "embeddings"))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        def fetch(filename: str) -> str:
+            if os.path.isdir(model_name):
+                return os.path.join(model_name, filename)
+            return hf_hub_download(_repo_id(model_name), filename, cache_dir=self.cache_dir)
+
+        modules = _read_json(fetch("modules.json"))
+        pooling_dir = next((m["path"] for m in modules if m["type"].endswith("Pooling")), "1_Pooling")
+        pooling = _read_json(fetch(f"{pooling_dir}/config.json"))
+        st_config = _read_json(fetch("sentence_bert_config.json"))
+
+        self.max_seq_length = st_config.get("max_seq_length") or min(
+            256, _read_json(fetch("config.json")).get("max_position_embeddings", 256)
+        )
+        self.normalize = any(m["type"].endswith("Normalize") for m in modules)
+        cls_pooling = pooling.get("pooling_mode_cls_token") or pooling.get("pooling_mode") == "cls"
+        self.pooling_mode = "cls" if cls_pooling else "mean"
+        self._dimension = pooling.get("word_embedding_dimension") or pooling["embedding_dimension"]
+
+        tokenizer_path = fetch("tokenizer.json")
+        self.tokenizer = _TokenizerAdapter(Tokenizer.from_file(tokenizer_path), self.max_seq_length)
+        self._tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._tokenizer.enable_truncation(self.max_seq_length)
+        if self._tokenizer.padding is None:
+            self._tokenizer.enable_padding()
+
+        model_path = fetch("onnx/model.onnx")
+        if quantize:
+            model_path = self._quantized(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.getenv("EMBEDDINGS_ONNX_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _quantized(self, model_path: str) -> str:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        out_dir = os.path.join(os.path.dirname(model_path), "int8")
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, "model_int8.onnx")
+        if not os.path.exists(out_path):
+            quantize_dynamic(model_path, out_path, weight_type=QuantType.QInt8)
+        return out_path
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def to(self, device: str):
+        if device != "cpu":
+            raise ValueError(f"ONNX backend runs on CPU only, got device '{device}'")
+        return self
+
+    def encode(self, texts, batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        matrix = np.empty((len(texts), self._dimension), dtype=np.float32)
+
+        for start in range(0, len(texts), batch_size):
+            encodings = self._tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            hidden = self.session.run(None, feeds)[0]
+            matrix[start:start + len(encodings)] = self._pool(hidden, attention_mask)
+
+        return matrix[0] if single else matrix
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling_mode == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32, copy=False)
+
+
+def load_onnx_encoder(model_name: str, quantize: bool = False) -> OnnxSentenceEncoder:
+    return OnnxSentenceEncoder(model_name, quantize=quantize)
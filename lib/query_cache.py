@@ -0,0 +1,84 @@
+"""In-memory LRU/TTL cache for query embeddings.
+
+Queries are normalized (whitespace collapsed, lowercased) before lookup.
+Kept separate from the persistent document embedding cache so repeated
+agent queries never evict bulk ingest vectors.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_items = max_items or int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+        self.ttl_seconds = ttl_seconds  # 0 disables expiry
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, vector = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector: np.ndarray):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
+
+
+def get_query_cache(**kwargs) -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(**kwargs)
@@ -5,100 +5,674 @@ Works with local or remote components.
 """
 
 import os
+import time
+import asyncio
 import hashlib
-from typing import List, Dict, Any, Optional
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 
+import numpy as np
+
 from lib.embeddings import get_embeddings
-from lib.vector_store import get_vector_store
+from lib.embedding_batcher import get_embedding_batcher
+from lib.embedding_pool import get_embedding_pool
+from lib.query_cache import get_query_cache, normalize_query
+from lib.search_cache import get_search_cache
+from lib.vector_store import get_vector_store, SEARCH_MODES
+from lib.ingest_manifest import get_ingest_manifest, file_digest
+from lib.ingest_pipeline import get_ingest_pipeline
+from lib.chunking import TokenChunker, WordChunker
 from lib.memory_layer import get_memory_layer
 
 
+logger = logging.getLogger(__name__)
+
+CHUNKERS = ("tokens", "words")
+
+RETRIEVAL_WORKERS = {"documents": 8, "memories": 4}
+
+TEXT_EXTENSIONS = {".txt", ".md", ".py", ".js", ".ts", ".java", ".cpp", ".c", ".go", ".rs"}
+
+EXTENSION_LANGUAGES = {
+    ".md": "markdown", ".py": "python", ".js": "javascript", ".ts": "typescript", ".java": "java",
+    ".cpp": "cpp", ".c": "c", ".go": "go", ".rs": "rust"
+}
+
+
 class RAGEngine:
     def __init__(
         self,
         vector_db_path: Optional[str] = None,
         embeddings_model: str = "all-MiniLM-L6-v2",
-        collection_name: str = "documents"
+        collection_name: str = "documents",
+        embedding_workers: Optional[int] = None,
+        chunker: Optional[str] = None
     ):
-        self.embeddings = get_embeddings(model_name=embeddings_model)
+        self.embeddings_model = embeddings_model
+        self.embedding_workers = embedding_workers if embedding_workers is not None else int(os.getenv("EMBEDDINGS_WORKERS", "0"))
+        self.query_cache = get_query_cache()
+        self.search_cache = get_search_cache()
         self.vector_store = get_vector_store(db_path=vector_db_path)
         self.memory = get_memory_layer()
         self.collection_name = collection_name
+        self.chunker = chunker or os.getenv("CHUNKER", "tokens")
+        if self.chunker not in CHUNKERS:
+            raise ValueError(f"Unknown chunker: {self.chunker}. Use one of {', '.join(CHUNKERS)}")
+        
+        self.document_timeout = float(os.getenv("SEARCH_DOCUMENT_TIMEOUT_SECONDS", "10"))
+        self.memory_timeout = float(os.getenv("SEARCH_MEMORY_TIMEOUT_SECONDS", "2"))
+        
+        self._chunkers: Dict[tuple, Any] = {}
+        self._retrieval_executors: Dict[str, ThreadPoolExecutor] = {}
+        self._embeddings = None
+        self._query_encoder = None
+        self._manifest = None
+        self._lock = threading.Lock()
+    
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    embeddings = get_embeddings(model_name=self.embeddings_model)
+                    if self.embedding_workers > 1:
+                        embeddings.pool = get_embedding_pool(
+                            model_name=self.embeddings_model,
+                            workers=self.embedding_workers,
+                            backend=embeddings.backend,
+                            dimension=embeddings.dimension
+                        )
+                    self._embeddings = embeddings
+        return self._embeddings
+    
+    @property
+    def query_encoder(self):
+        if self._query_encoder is None:
+            embeddings = self.embeddings
+            with self._lock:
+                if self._query_encoder is None:
+                    self._query_encoder = get_embedding_batcher(embeddings)
+        return self._query_encoder
+    
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    self._manifest = get_ingest_manifest(
+                        os.getenv("INGEST_MANIFEST_PATH") or os.path.join(self.vector_store.db_path, "ingest_manifest.sqlite")
+                    )
+        return self._manifest
     
     def ingest_text(
         self,
         text: str,
         metadata: Optional[Dict[str, Any]] = None,
-        chunk_size: int = 500,
-        overlap: int = 50
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
     ):
         chunks = self._chunk_text(text, chunk_size, overlap)
         
         ids = [self._generate_id(chunk) for chunk in chunks]
-        vectors = self.embeddings.encode(chunks)
-        metadatas = [metadata or {} for _ in chunks]
-        
-        self.vector_store.add_documents(
-            collection_name=self.collection_name,
-            ids=ids,
-            texts=chunks,
-            vectors=vectors,
-            metadatas=metadatas
-        )
+        added = self._add_chunks(chunks, [metadata or {} for _ in chunks], ids=ids)
         
-        return {"chunks": len(chunks), "ids": ids}
+        return {"chunks": len(chunks), "ids": ids, "skipped": added["skipped"]}
     
     def ingest_file(
         self,
         file_path: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        force: bool = False
     ):
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        text = path.read_text(encoding="utf-8")
+        key = str(path.absolute())
+        stat = path.stat()
+        entry = self.manifest.get(self.collection_name, key)
+        if not force and self.manifest.is_unchanged(entry, stat):
+            return self._unchanged_result(entry)
+        
+        data = path.read_bytes()
+        digest = file_digest(data)
+        if not force and entry is not None and entry["digest"] == digest:
+            self.manifest.touch(self.collection_name, key, stat)
+            return self._unchanged_result(entry)
+        
+        result = self.ingest_text(
+            data.decode("utf-8"), metadata=self._file_metadata(path, metadata), chunk_size=chunk_size, overlap=overlap
+        )
+        result["removed"] = self._commit_files([(key, stat, digest, result["ids"], entry)])
+        result["unchanged"] = False
+        return result
+    
+    def _unchanged_result(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        ids = entry["chunk_ids"]
+        return {"chunks": len(ids), "ids": ids, "skipped": len(ids), "removed": 0, "unchanged": True}
+    
+    def ingest_directory(
+        self,
+        directory: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        extensions: Optional[set] = None,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        batch_chunks: int = 4096,
+        force: bool = False,
+        prune: bool = True
+    ) -> Dict[str, Any]:
+        """Ingest new and modified files under directory.
+        
+        Unchanged files are skipped using the manifest. With prune, chunks of
+        files that disappeared from the directory are deleted.
+        """
+        root = Path(directory)
+        if not root.is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        
+        extensions = extensions or TEXT_EXTENSIONS
+        pending_chunks: List[str] = []
+        pending_metadatas: List[Dict[str, Any]] = []
+        pending_files: List[tuple] = []
+        seen = set()
+        totals = {"files": 0, "unchanged": 0, "chunks": 0, "skipped": 0, "removed": 0, "removed_files": 0, "failed": []}
+        
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in extensions:
+                continue
+            
+            key = str(path.absolute())
+            seen.add(key)
+            try:
+                stat = path.stat()
+                entry = self.manifest.get(self.collection_name, key)
+                if not force and self.manifest.is_unchanged(entry, stat):
+                    totals["unchanged"] += 1
+                    continue
+                
+                data = path.read_bytes()
+                digest = file_digest(data)
+                if not force and entry is not None and entry["digest"] == digest:
+                    self.manifest.touch(self.collection_name, key, stat)
+                    totals["unchanged"] += 1
+                    continue
+                
+                text = data.decode("utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                totals["failed"].append({"path": str(path), "error": str(e)})
+                continue
+            
+            chunks = self._chunk_text(text, chunk_size, overlap)
+            file_metadata = self._file_metadata(path, dict(metadata or {}))
+            pending_chunks.extend(chunks)
+            pending_metadatas.extend(file_metadata for _ in chunks)
+            pending_files.append((key, stat, digest, [self._generate_id(chunk) for chunk in chunks], entry))
+            totals["files"] += 1
+            
+            if len(pending_chunks) >= batch_chunks:
+                self._flush_files(totals, pending_chunks, pending_metadatas, pending_files)
+                pending_chunks, pending_metadatas, pending_files = [], [], []
+        
+        if pending_chunks or pending_files:
+            self._flush_files(totals, pending_chunks, pending_metadatas, pending_files)
+        
+        if prune:
+            self._prune_missing(root, seen, totals)
+        
+        return totals
+    
+    def ingest_pipelined(
+        self,
+        directory: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        extensions: Optional[set] = None,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        force: bool = False,
+        prune: bool = True,
+        **pipeline_options
+    ) -> Dict[str, Any]:
+        """ingest_directory through the staged IngestPipeline.
+        
+        Files are streamed rather than read whole, and reading, chunking,
+        embedding and writing overlap. The result adds per-stage stats.
+        """
+        root = Path(directory)
+        if not root.is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        
+        extensions = extensions or TEXT_EXTENSIONS
+        seen = set()
+        
+        def paths():
+            for path in sorted(root.rglob("*")):
+                if path.is_file() and path.suffix.lower() in extensions:
+                    seen.add(str(path.absolute()))
+                    yield path
+        
+        pipeline = get_ingest_pipeline(self, **pipeline_options)
+        totals = pipeline.run(paths(), metadata=metadata, chunk_size=chunk_size, overlap=overlap, force=force)
+        totals["removed_files"] = 0
+        if prune:
+            self._prune_missing(root, seen, totals)
+        
+        return totals
+    
+    def _prune_missing(self, root: Path, seen: set, totals: Dict[str, Any]):
+        prefix = str(root.absolute()) + os.sep
+        for key in self.manifest.paths(self.collection_name, prefix=prefix):
+            if key not in seen:
+                totals["removed"] += self._remove_file(key)
+                totals["removed_files"] += 1
+    
+    def _flush_files(
+        self,
+        totals: Dict[str, Any],
+        chunks: List[str],
+        metadatas: List[Dict[str, Any]],
+        files: List[tuple]
+    ):
+        if chunks:
+            self._add_totals(totals, self._add_chunks(chunks, metadatas))
+        totals["removed"] += self._commit_files(files)
+    
+    def _commit_files(self, files: List[tuple]) -> int:
+        """Record (key, stat, digest, chunk_ids, old entry) files and delete their stale chunks.
+        
+        Files are recorded only after their chunks are stored, so an interrupted
+        run redoes them. All files are recorded before deleting, so a chunk that
+        moved between files in the same batch is kept.
+        """
+        stale = []
+        for key, stat, digest, chunk_ids, entry in files:
+            self.manifest.put(self.collection_name, key, stat, digest, chunk_ids)
+            if entry is not None:
+                stale.extend(set(entry["chunk_ids"]) - set(chunk_ids))
+        return self._delete_chunks(stale) if stale else 0
+    
+    def _remove_file(self, key: str) -> int:
+        entry = self.manifest.get(self.collection_name, key)
+        self.manifest.remove(self.collection_name, key)
+        return self._delete_chunks(entry["chunk_ids"]) if entry else 0
+    
+    def _delete_chunks(self, chunk_ids) -> int:
+        # chunk ids are content hashes, so another file may still use the same chunk
+        unreferenced = self.manifest.unreferenced(self.collection_name, chunk_ids)
+        return self.vector_store.delete_documents(self.collection_name, unreferenced) if unreferenced else 0
+    
+    def _add_chunks(
+        self,
+        chunks: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        documents = self._embed_new_chunks(chunks, metadatas, ids)
+        if documents:
+            self.vector_store.upsert_documents(collection_name=self.collection_name, **documents)
+        return {"chunks": len(chunks), "skipped": len(chunks) - len(documents.get("ids", []))}
+    
+    def _embed_new_chunks(
+        self,
+        chunks: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Upsert arguments for the chunks not stored yet; empty if there are none."""
+        ids = ids or [self._generate_id(chunk) for chunk in chunks]
+        
+        # ids are content hashes, so a stored id means the chunk is already embedded
+        existing = self.vector_store.existing_ids(self.collection_name, ids)
+        new = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+        if not new:
+            return {}
+        
+        new_chunks = [chunks[i] for i in new]
+        return {
+            "ids": [ids[i] for i in new],
+            "texts": new_chunks,
+            "vectors": self.embeddings.encode_bulk(new_chunks),
+            "metadatas": [metadatas[i] for i in new]
+        }
+    
+    async def aingest_text(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
+    ):
+        chunks = await asyncio.to_thread(self._chunk_text, text, chunk_size, overlap)
+        
+        ids = [self._generate_id(chunk) for chunk in chunks]
+        documents = await asyncio.to_thread(
+            self._embed_new_chunks, chunks, [metadata or {} for _ in chunks], ids
+        )
+        if documents:
+            await self.vector_store.aupsert_documents(collection_name=self.collection_name, **documents)
         
+        return {"chunks": len(chunks), "ids": ids, "skipped": len(chunks) - len(documents.get("ids", []))}
+    
+    def _add_totals(self, totals: Dict[str, Any], added: Dict[str, int]):
+        totals["chunks"] += added["chunks"]
+        totals["skipped"] += added["skipped"]
+    
+    def _file_metadata(self, path: Path, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         file_metadata = metadata or {}
         file_metadata.update({
             "filename": path.name,
             "filepath": str(path.absolute()),
             "extension": path.suffix
         })
-        
-        return self.ingest_text(text, metadata=file_metadata)
+        language = EXTENSION_LANGUAGES.get(path.suffix.lower())
+        if language:
+            file_metadata.setdefault("language", language)
+        return file_metadata
     
     def search(
         self,
         query: str,
         limit: int = 5,
-        filter_metadata: Optional[Dict[str, Any]] = None
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        mode: str = "vector",
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> List[Dict[str, Any]]:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}. Use one of {', '.join(SEARCH_MODES)}")
+        
+        if not self.search_cache.enabled:
+            return self._search(query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow)
+        
+        key = self._search_key(
+            self.vector_store.collection_version(self.collection_name),
+            query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow
+        )
+        results = self.search_cache.get(key)
+        if results is None:
+            results = self._search(query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow)
+            self.search_cache.put(key, results)
+        return results
+    
+    def _search_key(self, version, query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow) -> tuple:
+        return self.search_cache.key(
+            query, self.collection_name, filter_metadata, limit, version,
+            nprobes=nprobes, refine_factor=refine_factor, mode=mode, columns=columns, as_arrow=as_arrow
+        )
+    
+    def _search(
+        self,
+        query: str,
+        limit: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        nprobes: Optional[int],
+        refine_factor: Optional[int],
+        mode: str,
+        columns: Optional[List[str]],
+        as_arrow: bool
     ) -> List[Dict[str, Any]]:
-        query_vector = self.embeddings.encode_single(query)
+        if mode == "fts":
+            return self.vector_store.text_search(
+                collection_name=self.collection_name,
+                query_text=query,
+                limit=limit,
+                filter_metadata=filter_metadata,
+                columns=columns,
+                as_arrow=as_arrow
+            )
+        
+        query_vector = self._encode_query(query)
+        
+        if mode == "hybrid":
+            return self.vector_store.hybrid_search(
+                collection_name=self.collection_name,
+                query_text=query,
+                query_vector=query_vector,
+                limit=limit,
+                filter_metadata=filter_metadata,
+                nprobes=nprobes,
+                refine_factor=refine_factor,
+                columns=columns,
+                as_arrow=as_arrow
+            )
         
         results = self.vector_store.search(
             collection_name=self.collection_name,
             query_vector=query_vector,
             limit=limit,
-            filter_metadata=filter_metadata
+            filter_metadata=filter_metadata,
+            nprobes=nprobes,
+            refine_factor=refine_factor,
+            columns=columns,
+            as_arrow=as_arrow
         )
         
         return results
     
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        mode: str = "vector",
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> List[Dict[str, Any]]:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}. Use one of {', '.join(SEARCH_MODES)}")
+        
+        if mode != "vector":
+            # fts and hybrid already run their BM25 and vector legs concurrently
+            return await asyncio.to_thread(
+                self.search, query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow
+            )
+        
+        key = None
+        if self.search_cache.enabled:
+            # versions from the async handles this search reads, so a lagging handle can't cache stale rows as fresh
+            version = await self.vector_store.acollection_version(self.collection_name)
+            key = self._search_key(version, query, limit, filter_metadata, nprobes, refine_factor, mode, columns, as_arrow)
+            results = self.search_cache.get(key)
+            if results is not None:
+                return results
+        
+        query_vector = self.query_cache.get(query)
+        if query_vector is None:
+            # concurrent calls are micro-batched by the query encoder
+            query_vector = await asyncio.to_thread(self._encode_query, query)
+        
+        results = await self.vector_store.asearch(
+            collection_name=self.collection_name,
+            query_vector=query_vector,
+            limit=limit,
+            filter_metadata=filter_metadata,
+            nprobes=nprobes,
+            refine_factor=refine_factor,
+            columns=columns,
+            as_arrow=as_arrow
+        )
+        if key is not None:
+            self.search_cache.put(key, results)
+        return results
+    
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filter_metadata: Optional[Union[Dict[str, Any], List[Optional[Dict[str, Any]]]]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        if not queries:
+            return []
+        
+        return self.vector_store.search_many(
+            collection_name=self.collection_name,
+            query_vectors=self._encode_queries(queries),
+            limit=limit,
+            filter_metadata=filter_metadata,
+            nprobes=nprobes,
+            refine_factor=refine_factor,
+            columns=columns,
+            as_arrow=as_arrow
+        )
+    
+    def _encode_queries(self, queries: List[str]):
+        vectors = [self.query_cache.get(query) for query in queries]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        if misses:
+            encoded = self.embeddings.encode_array([normalize_query(queries[i]) for i in misses], use_cache=False)
+            for i, vector in zip(misses, encoded):
+                self.query_cache.put(queries[i], vector)
+                vectors[i] = vector
+        
+        return np.stack(vectors)
+    
+    def _encode_query(self, query: str):
+        vector = self.query_cache.get(query)
+        if vector is None:
+            vector = self.query_encoder.encode_single_array(normalize_query(query))
+            self.query_cache.put(query, vector)
+        return vector
+    
     def search_with_memory(
         self,
         query: str,
         user_id: str,
-        limit: int = 5
+        limit: int = 5,
+        memory_limit: int = 3,
+        document_timeout: Optional[float] = None,
+        memory_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Search documents and memories concurrently.
+        
+        Each source's timeout runs from the start of the request. A source
+        that fails or misses its timeout contributes no results and is
+        reported under "errors"; "timings" has the seconds from the start of
+        the request until each source finished (its timeout, if it missed it).
+        """
+        start = time.perf_counter()
+        
+        def timed(fn, **kwargs):
+            try:
+                return fn(**kwargs), None, time.perf_counter()
+            except Exception as e:
+                return None, e, time.perf_counter()
+        
+        futures = {
+            "documents": (
+                self._retrieval_pool("documents").submit(timed, self.search, query=query, limit=limit),
+                self.document_timeout if document_timeout is None else document_timeout
+            ),
+            "memories": (
+                self._retrieval_pool("memories").submit(
+                    timed, self.memory.search, query=query, user_id=user_id, limit=memory_limit
+                ),
+                self.memory_timeout if memory_timeout is None else memory_timeout
+            )
+        }
+        
+        outcomes = {}
+        for name, (future, timeout) in futures.items():
+            try:
+                outcome = future.result(timeout=max(0.0, start + timeout - time.perf_counter()))
+            except FutureTimeoutError:
+                outcome = None, None, None
+            outcomes[name] = self._source_outcome(name, outcome, start, timeout)
+        
+        return self._with_memory_result(outcomes["documents"], outcomes["memories"], start)
+    
+    async def asearch_with_memory(
+        self,
+        query: str,
+        user_id: str,
+        limit: int = 5,
+        memory_limit: int = 3,
+        document_timeout: Optional[float] = None,
+        memory_timeout: Optional[float] = None
     ) -> Dict[str, Any]:
-        doc_results = self.search(query, limit=limit)
+        start = time.perf_counter()
         
-        memory_results = self.memory.search(query=query, user_id=user_id, limit=3)
+        async def timed(name: str, awaitable, timeout: float):
+            try:
+                outcome = (
+                    await asyncio.wait_for(awaitable, max(0.0, start + timeout - time.perf_counter())),
+                    None,
+                    time.perf_counter()
+                )
+            except asyncio.TimeoutError:
+                outcome = None, None, None
+            except Exception as e:
+                outcome = None, e, time.perf_counter()
+            return self._source_outcome(name, outcome, start, timeout)
         
+        documents, memories = await asyncio.gather(
+            timed(
+                "documents",
+                self.asearch(query, limit=limit),
+                self.document_timeout if document_timeout is None else document_timeout
+            ),
+            timed(
+                "memories",
+                asyncio.get_running_loop().run_in_executor(
+                    self._retrieval_pool("memories"),
+                    functools.partial(self.memory.search, query=query, user_id=user_id, limit=memory_limit)
+                ),
+                self.memory_timeout if memory_timeout is None else memory_timeout
+            )
+        )
+        return self._with_memory_result(documents, memories, start)
+    
+    def _source_outcome(self, name: str, outcome: tuple, start: float, timeout: float) -> tuple:
+        """(results, error, seconds) for one source; a call that finished past its deadline timed out."""
+        results, error, finished = outcome
+        if finished is None or finished > start + timeout:
+            # the call may still be running in its pool; its result is dropped
+            return None, f"timed out after {timeout}s", timeout
+        if error is not None:
+            logger.warning(f"{name} search failed: {error}")
+            return None, str(error), finished - start
+        return results, None, finished - start
+    
+    def _retrieval_pool(self, source: str) -> ThreadPoolExecutor:
+        """One bounded pool per source, so timed-out calls still running in one can't starve the other."""
+        pool = self._retrieval_executors.get(source)
+        if pool is None:
+            with self._lock:
+                pool = self._retrieval_executors.get(source)
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS[source], thread_name_prefix=f"rag-{source}")
+                    self._retrieval_executors[source] = pool
+        return pool
+    
+    def _with_memory_result(self, documents: tuple, memories: tuple, start: float) -> Dict[str, Any]:
+        doc_results, doc_error, doc_seconds = documents
+        memory_results, memory_error, memory_seconds = memories
+        errors = {
+            name: error for name, error in (("documents", doc_error), ("memories", memory_error)) if error
+        }
         return {
-            "documents": doc_results,
-            "memories": memory_results.get("results", [])
+            "documents": doc_results or [],
+            "memories": (memory_results or {}).get("results", []),
+            "timings": {
+                "documents": round(doc_seconds, 4),
+                "memories": round(memory_seconds, 4),
+                "total": round(time.perf_counter() - start, 4)
+            },
+            "errors": errors
         }
     
     def add_conversation(
@@ -109,22 +683,52 @@ class RAGEngine:
     ):
         return self.memory.add(messages, user_id=user_id, metadata=metadata)
     
-    def _chunk_text(self, text: str, chunk_size: int, overlap: int) -> List[str]:
-        words = text.split()
-        chunks = []
+    def get_chunker(self, chunk_size: Optional[int] = None, overlap: Optional[int] = None):
+        """Chunker for the configured mode.
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = " ".join(words[i:i + chunk_size])
-            if chunk:
-                chunks.append(chunk)
-        
-        return chunks
+        "tokens" (default): chunk_size and overlap are tokens, capped at the
+        embedding model's window. "words": whitespace words, 500 and 50 by default.
+        """
+        key = (chunk_size, overlap)
+        chunker = self._chunkers.get(key)
+        if chunker is None:
+            if self.chunker == "tokens":
+                model = self.embeddings.model
+                chunker = TokenChunker(model.tokenizer, model.max_seq_length, chunk_size, overlap)
+            else:
+                chunker = WordChunker(chunk_size or 500, 50 if overlap is None else overlap)
+            self._chunkers[key] = chunker
+        return chunker
+    
+    def _chunk_text(self, text: str, chunk_size: Optional[int] = None, overlap: Optional[int] = None) -> List[str]:
+        return self.get_chunker(chunk_size, overlap).chunk(text)
     
     def _generate_id(self, text: str) -> str:
         return hashlib.sha256(text.encode()).hexdigest()[:16]
     
     def list_collections(self) -> List[str]:
         return self.vector_store.list_collections()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            "query_embeddings": self.query_cache.stats(),
+            "search_results": self.search_cache.stats(),
+            # None until a model was needed; reporting must not load one
+            "document_embeddings": self._embeddings.cache_stats() if self._embeddings is not None else None,
+            "query_batcher": self._query_encoder.stats() if self._query_encoder is not None else None
+        }
+    
+    def close(self):
+        for pool in self._retrieval_executors.values():
+            pool.shutdown(wait=False)
+        if self._manifest is not None:
+            self._manifest.close()
+        if self._query_encoder is not None:
+            self._query_encoder.close()
+        if self._embeddings is not None:
+            if self._embeddings.pool is not None:
+                self._embeddings.pool.close()
+            self._embeddings.close()
 
 
 def get_rag_engine(**kwargs) -> RAGEngine:
@@ -0,0 +1,155 @@
+"""In-memory LRU cache for search results.
+
+Entries are keyed by normalized query, collection, filter, limit and the
+other search parameters, plus the collection's table version. Any ingest,
+delete, compaction or index build moves the version, so a lookup after a
+write never matches an entry cached before it; a collection's stale
+entries are dropped the first time its new version is seen. Eviction is
+least-recently-used under a byte budget (estimated result size).
+"""
+
+import os
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from lib.query_cache import normalize_query
+
+
+def result_bytes(value: Any) -> int:
+    """Rough in-memory size of a search result."""
+    if isinstance(value, pa.Table):
+        return value.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value) + 49
+    if isinstance(value, dict):
+        return 64 + sum(result_bytes(k) + result_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(result_bytes(item) for item in value)
+    return 16
+
+
+class SearchResultCache:
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.max_bytes = max_bytes  # 0 disables the cache
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        self._versions: Dict[str, Any] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(
+        self,
+        query: str,
+        collection: str,
+        filter_metadata: Optional[Dict[str, Any]],
+        limit: int,
+        version: Any,
+        **params
+    ) -> tuple:
+        filters = json.dumps(filter_metadata, sort_keys=True, default=str) if filter_metadata else ""
+        extra = tuple(sorted((name, tuple(value) if isinstance(value, list) else value) for name, value in params.items()))
+        return (normalize_query(query), collection, filters, limit, version, extra)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            self._check_version(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            results = entry[0]
+        # callers may mutate dict rows; Arrow tables are immutable
+        return results if isinstance(results, pa.Table) else copy.deepcopy(results)
+
+    def put(self, key: tuple, results: Any):
+        size = result_bytes(results)
+        if size > self.max_bytes:
+            return
+        if not isinstance(results, pa.Table):
+            results = copy.deepcopy(results)
+
+        with self._lock:
+            if not self._check_version(key):
+                return  # a newer version was seen while this search ran
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (results, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _check_version(self, key: tuple) -> bool:
+        """Drop a collection's entries when its version moves; False if key's version is outdated."""
+        collection, version = key[1], key[4]
+        current = self._versions.get(collection)
+        if current == version:
+            return True
+        if current is not None and self._is_older(version, current):
+            return False
+
+        stale = [k for k in self._entries if k[1] == collection]
+        for k in stale:
+            self.bytes -= self._entries.pop(k)[1]
+        self.invalidations += len(stale)
+        self._versions[collection] = version
+        return True
+
+    @staticmethod
+    def _is_older(version: Any, current: Any) -> bool:
+        # versions are (generation, ((table, version), ...)); same layout compares per table
+        generation, tables = version
+        current_generation, current_tables = current
+        if generation != current_generation:
+            return generation < current_generation
+        if [name for name, _ in tables] != [name for name, _ in current_tables]:
+            return False
+        return all(v <= c for (_, v), (_, c) in zip(tables, current_tables))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions
+            }
+
+
+def get_search_cache(**kwargs) -> SearchResultCache:
+    return SearchResultCache(**kwargs)
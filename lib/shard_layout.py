@@ -0,0 +1,109 @@
+"""Shard layout for collections split over several Lance tables.
+
+A sharded collection is stored as N tables named
+"<collection>__g<generation>_s<shard>". Rows are routed by a stable hash
+of their id. The layout (shard count and generation) is kept in a small
+JSON file next to the tables, so every process routes the same way.
+Resharding writes a new generation and switches the layout atomically.
+"""
+
+import os
+import json
+import heapq
+import hashlib
+import threading
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable
+
+
+def shard_of(doc_id: str, shards: int) -> int:
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def route(ids: List[str], shards: int) -> List[List[int]]:
+    """Row positions for each shard."""
+    positions: List[List[int]] = [[] for _ in range(shards)]
+    for i, doc_id in enumerate(ids):
+        positions[shard_of(doc_id, shards)].append(i)
+    return positions
+
+
+def merge_top_k(parts: Iterable[List[Dict[str, Any]]], limit: int, key: str, descending: bool = False) -> List[Dict[str, Any]]:
+    """k-way heap merge of per-shard results that are already sorted by key."""
+    return list(islice(heapq.merge(*parts, key=lambda row: row[key], reverse=descending), limit))
+
+
+def merge_by_rank(parts: Iterable[List[Dict[str, Any]]], limit: int, key: str, descending: bool = True) -> List[Dict[str, Any]]:
+    """Merge per-shard results whose scores are not comparable across shards.
+
+    BM25 statistics are per shard, so rows are interleaved by their rank
+    within their shard (what reciprocal-rank fusion gives for disjoint
+    ids), with ties broken by key.
+    """
+    sign = -1 if descending else 1
+    ranked = sorted(
+        ((rank, row) for part in parts for rank, row in enumerate(part)),
+        key=lambda item: (item[0], sign * item[1][key])
+    )
+    return [row for _, row in ranked[:limit]]
+
+
+class ShardLayout:
+    def __init__(self, db_path: str):
+        self.path = os.path.join(db_path, "_shards.json")
+        self._lock = threading.Lock()
+        self._layout: Dict[str, Dict[str, int]] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            self._layout, self._mtime = {}, None
+            return self._layout
+
+        if mtime != self._mtime:
+            with open(self.path, encoding="utf-8") as f:
+                self._layout = json.load(f)
+            self._mtime = mtime
+        return self._layout
+
+    def _save(self, layout: Dict[str, Dict[str, int]]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(layout, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._layout, self._mtime = layout, os.stat(self.path).st_mtime
+
+    @staticmethod
+    def table_names(name: str, generation: int, shards: int) -> List[str]:
+        return [f"{name}__g{generation}_s{i}" for i in range(shards)]
+
+    def get(self, name: str) -> Optional[Dict[str, int]]:
+        with self._lock:
+            return self._load().get(name)
+
+    def tables(self, name: str) -> Optional[List[str]]:
+        entry = self.get(name)
+        return self.table_names(name, entry["generation"], entry["shards"]) if entry else None
+
+    def collections(self) -> Dict[str, List[str]]:
+        with self._lock:
+            layout = self._load()
+        return {
+            name: self.table_names(name, entry["generation"], entry["shards"])
+            for name, entry in layout.items()
+        }
+
+    def set(self, name: str, shards: int, generation: int):
+        with self._lock:
+            layout = dict(self._load())
+            layout[name] = {"shards": shards, "generation": generation}
+            self._save(layout)
+
+    def remove(self, name: str):
+        with self._lock:
+            layout = dict(self._load())
+            if layout.pop(name, None) is not None:
+                self._save(layout)
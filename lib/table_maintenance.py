@@ -0,0 +1,176 @@
+"""Compaction, version cleanup and index optimization for Lance tables.
+
+Every write leaves a small fragment and a new table version behind.
+Maintenance merges small fragments, removes versions older than the
+retention window and folds new rows into existing indexes. It runs after
+a number of writes, on an optional schedule, or on demand. Lance commits
+each step as a new version, so readers keep working on the one they hold.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, Any, Optional, Callable, List
+
+logger = logging.getLogger(__name__)
+
+COMMIT_RETRIES = 3
+
+
+def _is_retryable(error: Exception) -> bool:
+    return isinstance(error, OSError) and "Retryable commit conflict" in str(error)
+
+
+def _snapshot(table) -> Dict[str, int]:
+    stats = table.stats()
+    return {
+        "fragments": stats["fragment_stats"]["num_fragments"],
+        "small_fragments": stats["fragment_stats"]["num_small_fragments"],
+        "bytes": stats["total_bytes"],
+        "versions": len(table.list_versions())
+    }
+
+
+class TableMaintenance:
+    def __init__(
+        self,
+        index_manager=None,
+        write_threshold: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+        retention_seconds: Optional[float] = None
+    ):
+        self.index_manager = index_manager
+        if write_threshold is None:
+            write_threshold = int(os.getenv("VECTOR_MAINTENANCE_WRITES", "100"))
+        self.write_threshold = write_threshold  # 0 disables write-triggered maintenance
+        if interval_seconds is None:
+            interval_seconds = float(os.getenv("VECTOR_MAINTENANCE_INTERVAL_SECONDS", "0"))
+        self.interval_seconds = interval_seconds  # 0 disables the schedule
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("VECTOR_VERSION_RETENTION_SECONDS", "3600"))
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._writes: Dict[str, int] = {}
+        self._running: Dict[str, threading.Thread] = {}
+        self._table_locks: Dict[str, threading.Lock] = {}
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_reports: Dict[str, Dict[str, Any]] = {}
+
+    def record_write(self, name: str, table):
+        if not self.write_threshold:
+            return
+
+        with self._lock:
+            writes = self._writes.get(name, 0) + 1
+            if writes < self.write_threshold:
+                self._writes[name] = writes
+                return
+            self._writes[name] = 0
+
+            running = self._running.get(name)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._maintain_logged, args=(name, table), name=f"maintain-{name}", daemon=True
+            )
+            self._running[name] = thread
+            thread.start()
+
+    def maintain(self, name: str, table, retention_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Compact, clean up and reindex one table. Returns a before/after report."""
+        retention = self.retention_seconds if retention_seconds is None else retention_seconds
+
+        with self._table_lock(name):
+            start = time.perf_counter()
+            before = _snapshot(table)
+
+            compaction = self._step(table, lambda dataset: dataset.optimize.compact_files())
+            index_optimized = False
+            if table.list_indices() and not (self.index_manager and self.index_manager.is_building(name)):
+                self._step(table, lambda dataset: dataset.optimize.optimize_indices())
+                index_optimized = True
+            cleanup = self._step(
+                table, lambda dataset: dataset.cleanup_old_versions(older_than=timedelta(seconds=retention))
+            )
+            after = _snapshot(table)
+
+        report = {
+            "collection": name,
+            "before": before,
+            "after": after,
+            "fragments_removed": compaction.fragments_removed,
+            "fragments_added": compaction.fragments_added,
+            "versions_removed": cleanup.old_versions,
+            "bytes_reclaimed": cleanup.bytes_removed,
+            "index_optimized": index_optimized,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+        self.last_reports[name] = report
+        return report
+
+    def _step(self, table, fn: Callable[[Any], Any]) -> Any:
+        """Run fn on the latest dataset version, retrying when a concurrent commit preempts it."""
+        for attempt in range(COMMIT_RETRIES):
+            # each step commits a new version; the next must start from it, not the handle's old one
+            table.checkout_latest()
+            try:
+                result = fn(table.to_lance())
+            except Exception as e:
+                if not _is_retryable(e) or attempt == COMMIT_RETRIES - 1:
+                    raise
+                logger.info(f"Retrying maintenance step on '{table.name}' after commit conflict: {e}")
+                continue
+            table.checkout_latest()
+            return result
+
+    def _maintain_logged(self, name: str, table):
+        try:
+            report = self.maintain(name, table)
+            logger.info(
+                f"Maintained '{name}': {report['before']['fragments']} -> {report['after']['fragments']} fragments, "
+                f"{report['bytes_reclaimed']} bytes reclaimed"
+            )
+        except Exception as e:
+            logger.error(f"Maintenance failed for '{name}': {e}")
+
+    def _table_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._table_locks.setdefault(name, threading.Lock())
+
+    def start(self, collections: Callable[[], List[str]], get_table: Callable[[str], Any]):
+        """Run maintenance over all collections every interval_seconds."""
+        if not self.interval_seconds:
+            return
+        with self._lock:
+            if self._scheduler is not None:
+                return
+            self._scheduler = threading.Thread(
+                target=self._schedule, args=(collections, get_table), name="table-maintenance", daemon=True
+            )
+            self._scheduler.start()
+
+    def _schedule(self, collections: Callable[[], List[str]], get_table: Callable[[str], Any]):
+        while not self._stop.wait(self.interval_seconds):
+            for name in collections():
+                self._maintain_logged(name, get_table(name))
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "write_threshold": self.write_threshold,
+                "interval_seconds": self.interval_seconds,
+                "retention_seconds": self.retention_seconds,
+                "pending_writes": dict(self._writes),
+                "last_reports": dict(self.last_reports)
+            }
+
+
+def get_table_maintenance(**kwargs) -> TableMaintenance:
+    return TableMaintenance(**kwargs)
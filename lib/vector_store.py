@@ -2,81 +2,849 @@
 
 Embedded database with no server required.
 Stores vectors in local directory.
+Collections may be sharded over several tables (see lib.shard_layout).
 """
 
 import os
-from typing import List, Dict, Any, Optional
-import lancedb
-from lancedb.pydantic import LanceModel, Vector
-from pydantic import Field
+import json
+import math
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
+from lib.flat_index import FlatIndex
+from lib.index_manager import get_index_manager
+from lib.shard_layout import ShardLayout, route, merge_top_k, merge_by_rank
+from lib.table_maintenance import get_table_maintenance
+from lib.metadata_filter import FILTER_COLUMNS, compile_filter, filter_values, sql_literal
 
-class DocumentSchema(LanceModel):
-    id: str
-    text: str
-    vector: Vector(384)  # dimension for all-MiniLM-L6-v2
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DIMENSION = 384  # dimension for all-MiniLM-L6-v2
+
+
+def document_schema(dimension: int = DEFAULT_DIMENSION) -> pa.Schema:
+    return pa.schema([
+        pa.field("id", pa.string()),
+        pa.field("text", pa.string()),
+        pa.field("vector", pa.list_(pa.float32(), dimension)),
+        pa.field("metadata", pa.string()),  # JSON-encoded metadata dict
+        *[pa.field(column, pa.string()) for column in FILTER_COLUMNS]
+    ])
+
+
+DocumentSchema = document_schema()
+
+
+def to_record_batch(
+    ids: List[str],
+    texts: List[str],
+    vectors: Union[np.ndarray, List[List[float]]],
+    metadatas: Optional[List[Dict[str, Any]]] = None
+) -> pa.RecordBatch:
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError(f"Expected {len(ids)} vectors, got array of shape {matrix.shape}")
+
+    dimension = matrix.shape[1]
+    vector_array = pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), dimension)
+    metadatas = metadatas or [{} for _ in ids]
+    values = [filter_values(meta) for meta in metadatas]
+
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(ids, type=pa.string()),
+            pa.array(texts, type=pa.string()),
+            vector_array,
+            pa.array([json.dumps(meta, sort_keys=True) for meta in metadatas], type=pa.string()),
+            *[pa.array([row[column] for row in values], type=pa.string()) for column in FILTER_COLUMNS]
+        ],
+        schema=document_schema(dimension)
+    )
+
+
+def _upsert_batch(
+    ids: List[str],
+    texts: List[str],
+    vectors: Union[np.ndarray, List[List[float]]],
+    metadatas: Optional[List[Dict[str, Any]]] = None
+) -> pa.RecordBatch:
+    # merge_insert rejects source rows sharing a key; the last occurrence wins
+    positions = list({doc_id: i for i, doc_id in enumerate(ids)}.values())
+    if len(positions) < len(ids):
+        ids = [ids[i] for i in positions]
+        texts = [texts[i] for i in positions]
+        vectors = np.asarray(vectors, dtype=np.float32)[positions]
+        metadatas = [metadatas[i] for i in positions] if metadatas else None
+    return to_record_batch(ids, texts, vectors, metadatas)
+
+
+SEARCH_MODES = ("vector", "fts", "hybrid")
+SEARCH_BACKENDS = ("lance", "flat")
+DEFAULT_COLUMNS = ("id", "text", "metadata")
+
+
+def _with_score(columns: List[str], score: str) -> List[str]:
+    """Projection including the score column, which Lance is deprecating projecting implicitly."""
+    return columns if score in columns else columns + [score]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], limit: int, k: int = 60) -> List[Dict[str, Any]]:
+    """Fuse ranked result lists by summing 1 / (k + rank) per document id."""
+    scores: Dict[str, float] = {}
+    rows: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, row in enumerate(results, 1):
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (k + rank)
+            rows.setdefault(row["id"], {}).update(row)
+
+    fused = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [dict(rows[doc_id], _rrf_score=scores[doc_id]) for doc_id in fused]
 
 
 class VectorStore:
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, consistency_seconds: Optional[float] = None):
         self.db_path = db_path or os.getenv("VECTOR_DB_PATH", "./data/vectors")
         os.makedirs(self.db_path, exist_ok=True)
-        self.db = lancedb.connect(self.db_path)
-    
-    def create_collection(self, name: str, schema=DocumentSchema):
-        if name not in self.db.table_names():
-            self.db.create_table(name, schema=schema, mode="create")
-        return self.db.open_table(name)
-    
-    def get_collection(self, name: str):
-        if name in self.db.table_names():
-            return self.db.open_table(name)
-        return self.create_collection(name)
-    
+        if consistency_seconds is None:
+            consistency_seconds = float(os.getenv("VECTOR_DB_CONSISTENCY_SECONDS", "5"))
+        self.consistency_seconds = consistency_seconds  # negative: only this process's writes are seen
+
+        self._db = None
+        self._adb = None
+        self._tables: Dict[str, Any] = {}
+        self._atables: Dict[str, Any] = {}
+        self._collections: Optional[List[str]] = None
+        self._epoch = 0  # bumped whenever table handles are dropped (drop, recreate, reshard)
+        self._lock = threading.Lock()
+        self.index_manager = get_index_manager()
+        self.maintenance = get_table_maintenance(index_manager=self.index_manager)
+
+        self.postfilter_selectivity = float(os.getenv("VECTOR_POSTFILTER_SELECTIVITY", "0.2"))
+        self._selectivity: "OrderedDict[Tuple[str, int, str], float]" = OrderedDict()
+        self._fts_ready: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.flat_max_rows = int(os.getenv("VECTOR_FLAT_MAX_ROWS", "50000"))
+        flat_collections = os.getenv("VECTOR_FLAT_COLLECTIONS", "")
+        self._backends: Dict[str, str] = {name.strip(): "flat" for name in flat_collections.split(",") if name.strip()}
+        self._flat: Dict[str, FlatIndex] = {}
+        self._flat_lock = threading.Lock()
+
+        self.layout = ShardLayout(self.db_path)
+        self.default_shards = int(os.getenv("VECTOR_SHARDS", "1"))
+        self.fanout_threads = int(os.getenv("VECTOR_SEARCH_THREADS", "8"))
+        self._fanout: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            import lancedb
+            interval = timedelta(seconds=self.consistency_seconds) if self.consistency_seconds >= 0 else None
+            self._db = lancedb.connect(self.db_path, read_consistency_interval=interval)
+        return self._db
+
+    async def adb(self):
+        if self._adb is None:
+            import lancedb
+            interval = timedelta(seconds=self.consistency_seconds) if self.consistency_seconds >= 0 else None
+            self._adb = await lancedb.connect_async(self.db_path, read_consistency_interval=interval)
+        return self._adb
+
+    async def _atable(self, name: str, dimension: int = DEFAULT_DIMENSION):
+        table = self._atables.get(name)
+        if table is None:
+            # the sync handle creates and migrates the table the first time
+            await asyncio.to_thread(self.get_collection, name, dimension)
+            table = await (await self.adb()).open_table(name)
+            self._atables[name] = table
+        return table
+
+    def create_collection(
+        self,
+        name: str,
+        schema: Optional[pa.Schema] = None,
+        dimension: int = DEFAULT_DIMENSION,
+        shards: int = 1
+    ):
+        """Create a table, or one table per shard when shards > 1 (returned as a list)."""
+        if shards > 1:
+            if self.layout.get(name) is None:
+                self.layout.set(name, shards, generation=1)
+            return [self._create_table(table_name, schema, dimension) for table_name in self.layout.tables(name)]
+        return self._create_table(name, schema, dimension)
+
+    def _create_table(self, name: str, schema: Optional[pa.Schema], dimension: int):
+        with self._lock:
+            table = self.db.create_table(name, schema=schema or document_schema(dimension), exist_ok=True)
+            self._tables[name] = table
+            self._collections = None
+        return table
+
+    def get_collection(self, name: str, dimension: int = DEFAULT_DIMENSION):
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+
+        try:
+            table = self.db.open_table(name)
+        except (ValueError, FileNotFoundError):
+            return self._create_table(name, None, dimension)
+
+        self._migrate(name, table)
+        with self._lock:
+            return self._tables.setdefault(name, table)
+
+    def _migrate(self, name: str, table):
+        """Add typed filter columns to collections created before they existed."""
+        names = set(table.schema.names)
+        missing = [column for column in FILTER_COLUMNS if column not in names]
+        if "metadata" not in names or not missing:
+            return
+
+        logger.info(f"Adding filter columns {missing} to '{name}'")
+        table.add_columns({column: "CAST(NULL AS string)" for column in missing})
+
+        for batch in table.to_lance().to_batches(columns=["id", "metadata"], batch_size=8192):
+            rows = [
+                {"id": doc_id, **filter_values(json.loads(meta) if meta else {})}
+                for doc_id, meta in zip(batch.column("id").to_pylist(), batch.column("metadata").to_pylist())
+            ]
+            rows = [row for row in rows if any(row[column] is not None for column in missing)]
+            if rows:
+                update = pa.Table.from_pylist(
+                    [{"id": row["id"], **{column: row[column] for column in missing}} for row in rows],
+                    schema=pa.schema([pa.field("id", pa.string())] + [pa.field(c, pa.string()) for c in missing])
+                )
+                table.merge_insert("id").when_matched_update_all().execute(update)
+
+    def invalidate(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._tables.clear()
+                self._fts_ready.clear()
+                self._flat.clear()
+                self._atables.clear()
+            else:
+                self._tables.pop(name, None)
+                self._atables.pop(name, None)
+                self._fts_ready.discard(name)
+                self._flat.pop(name, None)
+            self._collections = None
+            self._epoch += 1
+
+    def set_backend(self, name: str, backend: str):
+        """Serve a collection's unfiltered vector searches from Lance or the in-memory flat index."""
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError(f"Unknown search backend: {backend}. Use one of {', '.join(SEARCH_BACKENDS)}")
+        with self._lock:
+            self._backends[name] = backend
+            if backend != "flat":
+                self._flat.pop(name, None)
+
+    def backend(self, name: str) -> str:
+        return self._backends.get(name, "lance")
+
+    def _flat_index(self, name: str, table) -> Optional[FlatIndex]:
+        if self._backends.get(name) != "flat":
+            return None
+
+        index = self._flat.get(name)
+        if index is not None and index.is_current(table):
+            return index
+
+        with self._flat_lock:
+            index = self._flat.get(name)
+            if index is None:
+                rows = table.count_rows()
+                if rows > self.flat_max_rows:
+                    logger.warning(f"Flat backend for '{name}' holds {rows} rows (VECTOR_FLAT_MAX_ROWS={self.flat_max_rows})")
+                index = FlatIndex(table.schema.field("vector").type.list_size)
+            if not index.is_current(table):
+                index.load(table)
+            self._flat[name] = index
+        return index
+
     def add_documents(
         self,
         collection_name: str,
         ids: List[str],
         texts: List[str],
-        vectors: List[List[float]],
+        vectors: Union[np.ndarray, List[List[float]]],
         metadatas: Optional[List[Dict[str, Any]]] = None
     ):
-        table = self.get_collection(collection_name)
-        
-        metadatas = metadatas or [{} for _ in ids]
-        
-        documents = [
-            {"id": id_, "text": text, "vector": vec, "metadata": meta}
-            for id_, text, vec, meta in zip(ids, texts, vectors, metadatas)
+        if not ids:
+            return
+
+        self._write(collection_name, to_record_batch(ids, texts, vectors, metadatas), upsert=False)
+
+    def upsert_documents(
+        self,
+        collection_name: str,
+        ids: List[str],
+        texts: List[str],
+        vectors: Union[np.ndarray, List[List[float]]],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        if not ids:
+            return {"inserted": 0, "updated": 0}
+
+        return self._write(collection_name, _upsert_batch(ids, texts, vectors, metadatas), upsert=True)
+
+    def _write(self, name: str, batch: pa.RecordBatch, upsert: bool) -> Dict[str, int]:
+        dimension = batch.schema.field("vector").type.list_size
+        parts = self._route_batch(name, batch, dimension)
+        counts = self._fan_out(lambda part: self._write_table(part[0], part[1], upsert, dimension), parts)
+        return {key: sum(count[key] for count in counts) for key in ("inserted", "updated")}
+
+    def _route_batch(self, name: str, batch: pa.RecordBatch, dimension: int) -> List[Tuple[str, pa.RecordBatch]]:
+        """Split a batch into (table name, rows) per shard, creating new collections as needed."""
+        if self.default_shards > 1 and self.layout.get(name) is None and name not in self._table_names():
+            self.create_collection(name, dimension=dimension, shards=self.default_shards)
+
+        tables = self._shards(name)
+        if len(tables) == 1:
+            return [(tables[0], batch)]
+        positions = route(batch.column("id").to_pylist(), len(tables))
+        return [(table_name, batch.take(pa.array(p, type=pa.int64()))) for table_name, p in zip(tables, positions) if p]
+
+    def _write_table(self, name: str, batch: pa.RecordBatch, upsert: bool, dimension: int) -> Dict[str, int]:
+        table = self.get_collection(name, dimension=dimension)
+        previous_version = table.version
+        if upsert:
+            result = (
+                table.merge_insert("id")
+                .when_matched_update_all()
+                .when_not_matched_insert_all()
+                .execute(pa.Table.from_batches([batch]))
+            )
+            counts = {"inserted": result.num_inserted_rows, "updated": result.num_updated_rows}
+        else:
+            table.add(pa.Table.from_batches([batch]))
+            counts = {"inserted": batch.num_rows, "updated": 0}
+        self._after_write(name, table, batch, previous_version)
+        return counts
+
+    async def aadd_documents(
+        self,
+        collection_name: str,
+        ids: List[str],
+        texts: List[str],
+        vectors: Union[np.ndarray, List[List[float]]],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        if not ids:
+            return
+
+        await self._awrite(collection_name, to_record_batch(ids, texts, vectors, metadatas), upsert=False)
+
+    async def aupsert_documents(
+        self,
+        collection_name: str,
+        ids: List[str],
+        texts: List[str],
+        vectors: Union[np.ndarray, List[List[float]]],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        if not ids:
+            return {"inserted": 0, "updated": 0}
+
+        return await self._awrite(collection_name, _upsert_batch(ids, texts, vectors, metadatas), upsert=True)
+
+    async def _awrite(self, name: str, batch: pa.RecordBatch, upsert: bool) -> Dict[str, int]:
+        dimension = batch.schema.field("vector").type.list_size
+        parts = await asyncio.to_thread(self._route_batch, name, batch, dimension)
+        counts = await asyncio.gather(*(
+            self._awrite_table(table_name, part, upsert, dimension) for table_name, part in parts
+        ))
+        return {key: sum(count[key] for count in counts) for key in ("inserted", "updated")}
+
+    async def _awrite_table(self, name: str, batch: pa.RecordBatch, upsert: bool, dimension: int) -> Dict[str, int]:
+        table = await self._atable(name, dimension)
+        previous_version = await table.version()
+        data = pa.Table.from_batches([batch])
+        if upsert:
+            result = await (
+                table.merge_insert("id")
+                .when_matched_update_all()
+                .when_not_matched_insert_all()
+                .execute(data)
+            )
+            counts = {"inserted": result.num_inserted_rows, "updated": result.num_updated_rows}
+        else:
+            await table.add(data)
+            counts = {"inserted": batch.num_rows, "updated": 0}
+        await asyncio.to_thread(self._after_async_write, name, batch, previous_version)
+        return counts
+
+    def _after_async_write(self, name: str, batch: pa.RecordBatch, previous_version: int):
+        # the sync handle has not seen the async commit yet
+        table = self.get_collection(name)
+        table.checkout_latest()
+        self._after_write(name, table, batch, previous_version)
+
+    def _after_write(self, name: str, table, batch: pa.RecordBatch, previous_version: int):
+        flat = self._flat.get(name)
+        if flat is not None:
+            flat.apply(batch, table.version, previous_version)
+        self.index_manager.maybe_index(name, table)
+        self.maintenance.record_write(name, table)
+        self.maintenance.start(self._table_names, self.get_collection)
+
+    def collection_version(self, name: str) -> Tuple[int, Tuple[Tuple[str, int], ...]]:
+        """Version of every table behind a collection; changes with any write, delete or drop."""
+        epoch = self._epoch
+        return epoch, tuple((table_name, self.get_collection(table_name).version) for table_name in self._shards(name))
+
+    async def acollection_version(self, name: str) -> Tuple[int, Tuple[Tuple[str, int], ...]]:
+        """collection_version as seen by the async handles, which may lag the sync ones."""
+        epoch = self._epoch
+        tables = self._shards(name)
+        versions = await asyncio.gather(*(self._aversion(table_name) for table_name in tables))
+        return epoch, tuple(zip(tables, versions))
+
+    async def _aversion(self, name: str) -> int:
+        return await (await self._atable(name)).version()
+
+    def _shards(self, name: str) -> List[str]:
+        """Physical table names behind a collection."""
+        return self.layout.tables(name) or [name]
+
+    def _fan_out(self, fn, items: List[Any]) -> List[Any]:
+        if len(items) == 1:
+            return [fn(items[0])]
+        if self._fanout is None:
+            with self._lock:
+                if self._fanout is None:
+                    self._fanout = ThreadPoolExecutor(max_workers=self.fanout_threads, thread_name_prefix="shard-fanout")
+        return list(self._fanout.map(fn, items))
+
+    def _route_ids(self, name: str, ids: List[str]) -> List[Tuple[str, List[str]]]:
+        tables = self._shards(name)
+        unique_ids = list(dict.fromkeys(ids))
+        if len(tables) == 1:
+            return [(tables[0], unique_ids)]
+        return [
+            (table_name, [unique_ids[i] for i in p])
+            for table_name, p in zip(tables, route(unique_ids, len(tables))) if p
         ]
-        
-        table.add(documents)
-    
+
+    def existing_ids(self, collection_name: str, ids: List[str], batch_size: int = 1000) -> set:
+        parts = self._route_ids(collection_name, ids)
+        return set().union(*self._fan_out(lambda part: self._existing_ids_table(part[0], part[1], batch_size), parts))
+
+    def delete_documents(self, collection_name: str, ids: List[str], batch_size: int = 1000) -> int:
+        """Delete rows by id. Returns the number of rows removed."""
+        if not ids:
+            return 0
+        parts = self._route_ids(collection_name, ids)
+        return sum(self._fan_out(lambda part: self._delete_table(part[0], part[1], batch_size), parts))
+
+    def _delete_table(self, name: str, ids: List[str], batch_size: int) -> int:
+        if not ids or name not in self._table_names():
+            return 0
+
+        table = self.get_collection(name)
+        before = table.count_rows()
+        for start in range(0, len(ids), batch_size):
+            id_list = ", ".join(sql_literal(doc_id) for doc_id in ids[start:start + batch_size])
+            table.delete(f"id IN ({id_list})")
+
+        with self._lock:
+            self._flat.pop(name, None)  # FlatIndex cannot drop rows; it reloads on the next search
+        self.maintenance.record_write(name, table)
+        return before - table.count_rows()
+
+    def _existing_ids_table(self, name: str, ids: List[str], batch_size: int) -> set:
+        if not ids or name not in self._table_names():
+            return set()
+
+        table = self.get_collection(name)
+        if table.count_rows() == 0:
+            return set()
+        self.index_manager.ensure_scalar_index(table, "id")
+
+        found = set()
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            id_list = ", ".join(sql_literal(doc_id) for doc_id in chunk)
+            rows = table.search().where(f"id IN ({id_list})").select(["id"]).limit(len(chunk)).to_arrow()
+            found.update(rows.column("id").to_pylist())
+        return found
+
     def search(
         self,
         collection_name: str,
-        query_vector: List[float],
+        query_vector: Union[np.ndarray, List[float]],
         limit: int = 5,
-        filter_metadata: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
-        table = self.get_collection(collection_name)
-        
-        query = table.search(query_vector).limit(limit)
-        
-        if filter_metadata:
-            filter_str = " AND ".join([f"metadata.{k} = '{v}'" for k, v in filter_metadata.items()])
-            query = query.where(filter_str)
-        
-        results = query.to_list()
-        return results
-    
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> Union[List[Dict[str, Any]], pa.Table]:
+        """Vector search returning the requested columns plus _distance.
+
+        columns defaults to DEFAULT_COLUMNS; add "vector" to get embeddings
+        back. as_arrow returns a pyarrow Table with metadata left as JSON.
+        """
+        columns = list(columns or DEFAULT_COLUMNS)
+        matrix = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        tables = self._shards(collection_name)
+        parts = self._fan_out(
+            lambda name: self._vector_part(name, matrix, limit, filter_metadata, nprobes, refine_factor, columns, len(tables) == 1),
+            tables
+        )
+        return self._merge([part[0] for part in parts], limit, "_distance", False, as_arrow)
+
+    def search_many(
+        self,
+        collection_name: str,
+        query_vectors: Union[np.ndarray, List[List[float]]],
+        limit: int = 5,
+        filter_metadata: Optional[Union[Dict[str, Any], List[Optional[Dict[str, Any]]]]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        max_workers: int = 8,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> List[Union[List[Dict[str, Any]], pa.Table]]:
+        """Search several query vectors, returning one result set per query.
+
+        A single (or no) filter runs as one multi-vector Lance query per
+        table. A list of per-query filters falls back to parallel single searches.
+        """
+        if len(query_vectors) == 0:
+            return []
+        matrix = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        columns = list(columns or DEFAULT_COLUMNS)
+
+        if isinstance(filter_metadata, list):
+            if len(filter_metadata) != len(matrix):
+                raise ValueError(f"Expected {len(matrix)} filters, got {len(filter_metadata)}")
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(matrix))) as executor:
+                return list(executor.map(
+                    lambda args: self.search(
+                        collection_name, args[0], limit, args[1], nprobes, refine_factor, columns, as_arrow
+                    ),
+                    zip(matrix, filter_metadata)
+                ))
+
+        tables = self._shards(collection_name)
+        parts = self._fan_out(
+            lambda name: self._vector_part(name, matrix, limit, filter_metadata, nprobes, refine_factor, columns, len(tables) == 1),
+            tables
+        )
+        return [
+            self._merge([part[i] for part in parts], limit, "_distance", False, as_arrow)
+            for i in range(len(matrix))
+        ]
+
+    async def asearch(
+        self,
+        collection_name: str,
+        query_vector: Union[np.ndarray, List[float]],
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> Union[List[Dict[str, Any]], pa.Table]:
+        """Async counterpart of search."""
+        columns = list(columns or DEFAULT_COLUMNS)
+        vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        tables = self._shards(collection_name)
+
+        if len(tables) == 1 and not filter_metadata and self.backend(collection_name) == "flat":
+            return await asyncio.to_thread(
+                self.search, collection_name, vector, limit, None, nprobes, refine_factor, columns, as_arrow
+            )
+
+        parts = await asyncio.gather(*(
+            self._avector_part(name, vector, limit, filter_metadata, nprobes, refine_factor, columns)
+            for name in tables
+        ))
+        return self._merge(list(parts), limit, "_distance", False, as_arrow)
+
+    async def _avector_part(
+        self,
+        name: str,
+        vector: np.ndarray,
+        limit: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        nprobes: Optional[int],
+        refine_factor: Optional[int],
+        columns: List[str]
+    ) -> pa.Table:
+        table = await self._atable(name)
+        query = table.vector_search(vector)
+        if nprobes:
+            query = query.nprobes(nprobes)
+        if refine_factor:
+            query = query.refine_factor(refine_factor)
+
+        fetch = limit
+        sync_table = self.get_collection(name)
+        where = compile_filter(filter_metadata, set(FILTER_COLUMNS) & set(sync_table.schema.names))
+        if where:
+            prefilter, selectivity = await asyncio.to_thread(self._filter_plan, sync_table, where)
+            query = query.where(where)
+            if not prefilter:
+                fetch = math.ceil(limit / selectivity * 1.5)
+                query = query.postfilter()
+        return (await query.select(_with_score(columns, "_distance")).limit(fetch).to_arrow()).slice(0, limit)
+
+    def _vector_part(
+        self,
+        name: str,
+        matrix: np.ndarray,
+        limit: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        nprobes: Optional[int],
+        refine_factor: Optional[int],
+        columns: List[str],
+        allow_flat: bool
+    ) -> List[Union[pa.Table, List[Dict[str, Any]]]]:
+        """Per-query results from one table, each sorted by _distance."""
+        table = self.get_collection(name)
+        flat = self._flat_index(name, table) if allow_flat and not filter_metadata else None
+        if flat is not None and flat.covers(columns):
+            return flat.search(matrix, limit, columns)
+
+        if len(matrix) == 1:
+            query = self._query(table, matrix[0], limit, filter_metadata, nprobes, refine_factor)
+            return [query.select(_with_score(columns, "_distance")).to_arrow().slice(0, limit)]
+
+        query = self._query(table, list(matrix), limit, filter_metadata, nprobes, refine_factor)
+        results = query.select(_with_score(columns, "_distance")).to_arrow()
+        query_index = results.column("query_index")
+        results = results.drop_columns(["query_index"])
+        return [results.filter(pc.equal(query_index, i)).slice(0, limit) for i in range(len(matrix))]
+
+    def _query(self, table, query_vector, limit: int, filter_metadata: Optional[Dict[str, Any]], nprobes: Optional[int], refine_factor: Optional[int]):
+        query = table.search(query_vector)
+        if nprobes:
+            query = query.nprobes(nprobes)
+        if refine_factor:
+            query = query.refine_factor(refine_factor)
+
+        where = compile_filter(filter_metadata, set(FILTER_COLUMNS) & set(table.schema.names))
+        if where:
+            prefilter, selectivity = self._filter_plan(table, where)
+            if not prefilter:
+                # postfiltering drops non-matching candidates, so over-fetch by the expected loss
+                limit = math.ceil(limit / selectivity * 1.5)
+            query = query.where(where, prefilter=prefilter)
+        return query.limit(limit)
+
+    def text_search(
+        self,
+        collection_name: str,
+        query_text: str,
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> Union[List[Dict[str, Any]], pa.Table]:
+        columns = list(columns or DEFAULT_COLUMNS)
+        parts = self._fan_out(
+            lambda name: self._text_part(name, query_text, limit, filter_metadata, columns),
+            self._shards(collection_name)
+        )
+        if len(parts) == 1:
+            return self._finish(parts[0], as_arrow)
+        return self._finish(merge_by_rank([part.to_pylist() for part in parts], limit, "_score"), as_arrow)
+
+    def _text_part(self, name: str, query_text: str, limit: int, filter_metadata: Optional[Dict[str, Any]], columns: List[str]) -> pa.Table:
+        table = self.get_collection(name)
+        if name not in self._fts_ready:
+            self.index_manager.ensure_fts_index(table)
+            self._fts_ready.add(name)
+
+        query = table.search(query_text, query_type="fts").limit(limit)
+        where = compile_filter(filter_metadata, set(FILTER_COLUMNS) & set(table.schema.names))
+        if where:
+            query = query.where(where, prefilter=True)
+        return query.select(_with_score(columns, "_score")).to_arrow()
+
+    def hybrid_search(
+        self,
+        collection_name: str,
+        query_text: str,
+        query_vector: Union[np.ndarray, List[float]],
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        candidates: Optional[int] = None,
+        rrf_k: int = 60,
+        columns: Optional[List[str]] = None,
+        as_arrow: bool = False
+    ) -> Union[List[Dict[str, Any]], pa.Table]:
+        """BM25 and vector search run concurrently, fused with reciprocal-rank fusion."""
+        candidates = candidates or max(limit * 4, 20)
+        columns = list(columns or DEFAULT_COLUMNS)
+        fetch = columns if "id" in columns else ["id"] + columns  # fusion keys on id
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+        text_future = self._executor.submit(
+            self.text_search, collection_name, query_text, candidates, filter_metadata, fetch, True
+        )
+        vector_results = self.search(
+            collection_name, query_vector, candidates, filter_metadata, nprobes, refine_factor, fetch, True
+        )
+        fused = reciprocal_rank_fusion([vector_results.to_pylist(), text_future.result().to_pylist()], limit, k=rrf_k)
+        for row in fused:
+            row.setdefault("_distance", None)
+            row.setdefault("_score", None)
+            if "id" not in columns:
+                del row["id"]
+        return self._finish(fused, as_arrow)
+
+    def _merge(
+        self,
+        parts: List[Union[pa.Table, List[Dict[str, Any]]]],
+        limit: int,
+        key: str,
+        descending: bool,
+        as_arrow: bool
+    ) -> Union[List[Dict[str, Any]], pa.Table]:
+        if len(parts) == 1:
+            return self._finish(parts[0], as_arrow)
+        rows = merge_top_k([part.to_pylist() if isinstance(part, pa.Table) else part for part in parts], limit, key, descending)
+        return self._finish(rows, as_arrow)
+
+    def _finish(self, results: Union[pa.Table, List[Dict[str, Any]]], as_arrow: bool) -> Union[List[Dict[str, Any]], pa.Table]:
+        if as_arrow:
+            return results if isinstance(results, pa.Table) else pa.Table.from_pylist(results)
+        rows = results.to_pylist() if isinstance(results, pa.Table) else results
+        for row in rows:
+            if "metadata" in row:
+                row["metadata"] = json.loads(row["metadata"]) if row["metadata"] else {}
+        return rows
+
+    def _filter_plan(self, table, where: str) -> Tuple[bool, float]:
+        """Return (prefilter, selectivity) for a compiled filter.
+
+        Without a vector index the search is a flat scan, and prefiltering
+        only shrinks it. With an index, broad filters are applied after the
+        ANN search, and narrow ones before it so matches are not starved out.
+        """
+        if self.index_manager.vector_index_name(table) is None:
+            return True, 1.0
+
+        key = (table.name, table.version, where)
+        selectivity = self._selectivity.get(key)
+        if selectivity is None:
+            rows = table.count_rows()
+            selectivity = table.count_rows(where) / rows if rows else 0.0
+            with self._lock:
+                self._selectivity[key] = selectivity
+                while len(self._selectivity) > 256:
+                    self._selectivity.popitem(last=False)
+        return selectivity < self.postfilter_selectivity, selectivity
+
+    def ensure_index(self, name: str, force: bool = False, wait: bool = True) -> Optional[str]:
+        actions = [
+            self.index_manager.maybe_index(table_name, self.get_collection(table_name), force=force, wait=wait)
+            for table_name in self._shards(name)
+        ]
+        return next((action for action in actions if action), None)
+
+    def index_status(self, name: str) -> Dict[str, Any]:
+        tables = self._shards(name)
+        if len(tables) > 1:
+            shards = [self.index_manager.status(self.get_collection(table_name)) for table_name in tables]
+            return {"rows": sum(shard["rows"] for shard in shards), "shards": shards, "backend": "lance"}
+
+        status = self.index_manager.status(self.get_collection(name))
+        status["backend"] = self.backend(name)
+        if name in self._flat:
+            status["flat"] = self._flat[name].stats()
+        return status
+
+    def maintain(self, name: Optional[str] = None, retention_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        names = [name] if name else self.list_collections()
+        return [
+            self.maintenance.maintain(table_name, self.get_collection(table_name), retention_seconds)
+            for n in names for table_name in self._shards(n)
+        ]
+
+    def reshard(self, name: str, shards: int, batch_size: int = 8192) -> Dict[str, Any]:
+        """Move a collection onto a new set of shards, routing every row by id.
+
+        Writes to the collection must be paused while this runs; readers
+        see the old layout until the new one is switched in.
+        """
+        if shards < 1:
+            raise ValueError(f"Shard count must be at least 1, got {shards}")
+
+        old_tables = self._shards(name)
+        entry = self.layout.get(name)
+        generation = entry["generation"] + 1 if entry else 1
+        schema = self.get_collection(old_tables[0]).schema
+
+        # tables left by an interrupted reshard to this generation would keep their rows
+        prefix = f"{name}__g{generation}_s"
+        leftover = [table_name for table_name in self._table_names() if table_name.startswith(prefix)]
+        for table_name in leftover:
+            self.db.drop_table(table_name)
+            self.invalidate(table_name)
+
+        new_tables = ShardLayout.table_names(name, generation, shards)
+        targets = [self._create_table(table_name, schema, DEFAULT_DIMENSION) for table_name in new_tables]
+
+        moved = 0
+        for old_name in old_tables:
+            for batch in self.get_collection(old_name).to_lance().to_batches(batch_size=batch_size):
+                for target, positions in zip(targets, route(batch.column("id").to_pylist(), shards)):
+                    if positions:
+                        target.add(pa.Table.from_batches([batch.take(pa.array(positions, type=pa.int64()))]))
+                moved += batch.num_rows
+
+        self.layout.set(name, shards, generation)
+        for old_name in old_tables:
+            self.db.drop_table(old_name)
+            self.invalidate(old_name)
+        for table_name, target in zip(new_tables, targets):
+            self.index_manager.maybe_index(table_name, target)
+
+        return {"collection": name, "rows": moved, "from_shards": len(old_tables), "to_shards": shards}
+
     def delete_collection(self, name: str):
-        if name in self.db.table_names():
-            self.db.drop_table(name)
-    
+        tables = self._shards(name)
+        existing = self._table_names()
+        for table_name in tables:
+            if table_name in existing:
+                self.db.drop_table(table_name)
+            self.invalidate(table_name)
+        self.layout.remove(name)
+        self.invalidate(name)
+
+    def _table_names(self) -> List[str]:
+        tables = self._collections
+        if tables is None:
+            tables = list(self.db.table_names())
+            with self._lock:
+                self._collections = tables
+        return tables
+
     def list_collections(self) -> List[str]:
-        return self.db.table_names()
+        sharded = self.layout.collections()
+        shard_tables = {table_name for tables in sharded.values() for table_name in tables}
+        return [name for name in self._table_names() if name not in shard_tables] + sorted(sharded)
 
 
 def get_vector_store(db_path: Optional[str] = None) -> VectorStore:
@@ -6,18 +6,25 @@ Carbon Fiber Principle: Maximum strength with minimum weight
 """
 
 import os
+import sys
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp import types
 
 from mem0 import Memory
 import lancedb
-from sentence_transformers import SentenceTransformer
+
+from lib.memory_layer import use_shared_embedder
+from lib.model_registry import get_model_registry
+from lib.rag_engine import get_rag_engine
 
 load_dotenv()
 
@@ -32,6 +39,9 @@ class BuenaturaRAGServer:
         self.data_dir = Path(os.getenv("RAG_DATA_DIR", "C:\\BUENATURA\\knowledge"))
         self.db_dir = Path(os.getenv("RAG_DB_DIR", "C:\\BUENATURA\\mem0\\vectors"))
         
+        embedding_model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        
+        use_shared_embedder()
         self.memory = Memory(
             config={
                 "vector_store": {
@@ -41,17 +51,17 @@ class BuenaturaRAGServer:
                     }
                 },
                 "embedder": {
-                    "provider": "sentence_transformers",
+                    "provider": "huggingface",
                     "config": {
-                        "model": os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+                        "model": embedding_model
                     }
                 }
             }
         )
         
-        self.embedding_model = SentenceTransformer(
-            os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-        )
+        self.embedding_model = get_model_registry().acquire(embedding_model)
+        self.embedding_model_name = embedding_model
+        self._engine = None
         
         logging.info("✅ BUENATURA RAG Server initialized")
     
@@ -99,6 +109,42 @@ class BuenaturaRAGServer:
             logging.error(f"❌ Search failed: {e}")
             return []
     
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = get_rag_engine(embeddings_model=self.embedding_model_name)
+        return self._engine
+    
+    def search_documents(
+        self,
+        query: str,
+        limit: int = 5,
+        mode: str = "hybrid"
+    ) -> List[Dict[str, Any]]:
+        """Search ingested documents by vector, keyword (fts) or hybrid retrieval"""
+        try:
+            results = self.engine.search(query, limit=limit, mode=mode)
+            logging.info(f"🔍 Document search ({mode}): '{query}' - {len(results)} results")
+            return results
+        except Exception as e:
+            logging.error(f"❌ Document search failed: {e}")
+            return []
+    
+    async def asearch_documents(
+        self,
+        query: str,
+        limit: int = 5,
+        mode: str = "hybrid"
+    ) -> List[Dict[str, Any]]:
+        """Async document search that keeps the server's event loop free"""
+        try:
+            results = await self.engine.asearch(query, limit=limit, mode=mode)
+            logging.info(f"🔍 Document search ({mode}): '{query}' - {len(results)} results")
+            return results
+        except Exception as e:
+            logging.error(f"❌ Document search failed: {e}")
+            return []
+    
     def get_all_memories(self, user_id: str = "valentin") -> List[Dict[str, Any]]:
         """Retrieve all memories for user"""
         try:
@@ -169,6 +215,29 @@ async def list_tools() -> List[types.Tool]:
                 "required": ["query"]
             }
         ),
+        types.Tool(
+            name="search_documents",
+            description="Search ingested documents; hybrid mode also matches exact identifiers and error codes",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Search query"
+                    },
+                    "limit": {
+                        "type": "number",
+                        "description": "Max results (default: 5)"
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["vector", "fts", "hybrid"],
+                        "description": "Retrieval mode (default: hybrid)"
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
         types.Tool(
             name="get_all_memories",
             description="Retrieve all memories for a user",
@@ -210,14 +279,16 @@ async def call_tool(
     """Execute RAG tool"""
     
     if name == "ingest_document":
-        result = rag.ingest_document(
+        result = await asyncio.to_thread(
+            rag.ingest_document,
             file_path=arguments["file_path"],
             user_id=arguments.get("user_id", "valentin")
         )
         return [types.TextContent(type="text", text=str(result))]
     
     elif name == "search_memories":
-        results = rag.search_memories(
+        results = await asyncio.to_thread(
+            rag.search_memories,
             query=arguments["query"],
             user_id=arguments.get("user_id", "valentin"),
             limit=arguments.get("limit", 5)
@@ -228,8 +299,21 @@ async def call_tool(
                  "\n\n".join([f"- {r['memory']}" for r in results])
         )]
     
+    elif name == "search_documents":
+        results = await rag.asearch_documents(
+            query=arguments["query"],
+            limit=int(arguments.get("limit", 5)),
+            mode=arguments.get("mode", "hybrid")
+        )
+        return [types.TextContent(
+            type="text",
+            text=f"Found {len(results)} documents:\n\n" +
+                 "\n\n".join([f"- {r['text'][:300]}" for r in results])
+        )]
+    
     elif name == "get_all_memories":
-        memories = rag.get_all_memories(
+        memories = await asyncio.to_thread(
+            rag.get_all_memories,
             user_id=arguments.get("user_id", "valentin")
         )
         return [types.TextContent(
@@ -239,7 +323,8 @@ async def call_tool(
         )]
     
     elif name == "add_conversation":
-        result = rag.add_conversation(
+        result = await asyncio.to_thread(
+            rag.add_conversation,
             messages=arguments["messages"],
             user_id=arguments.get("user_id", "valentin")
         )
@@ -257,5 +342,4 @@ async def main():
         )
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
@@ -100,11 +100,12 @@ async def handle_call_tool(
             "role": arguments.get("role", "user"),
             "content": arguments["content"]
         }]
-        result = memory.add(messages, user_id=arguments["user_id"])
+        result = await asyncio.to_thread(memory.add, messages, user_id=arguments["user_id"])
         return [types.TextContent(type="text", text=f"Memory added successfully. ID: {result}")]
     
     elif name == "search_memories":
-        results = memory.search(
+        results = await asyncio.to_thread(
+            memory.search,
             query=arguments["query"],
             user_id=arguments["user_id"],
             limit=arguments.get("limit", 5)
@@ -121,7 +122,7 @@ async def handle_call_tool(
         return [types.TextContent(type="text", text=formatted)]
     
     elif name == "get_all_memories":
-        memories = memory.get_all(user_id=arguments["user_id"])
+        memories = await asyncio.to_thread(memory.get_all, user_id=arguments["user_id"])
         
         if not memories:
             return [types.TextContent(type="text", text="No memories found for this user.")]
@@ -133,11 +134,11 @@ async def handle_call_tool(
         return [types.TextContent(type="text", text=formatted)]
     
     elif name == "delete_memory":
-        memory.delete(memory_id=arguments["memory_id"])
+        await asyncio.to_thread(memory.delete, memory_id=arguments["memory_id"])
         return [types.TextContent(type="text", text=f"Memory {arguments['memory_id']} deleted.")]
     
     elif name == "delete_all_memories":
-        memory.delete_all(user_id=arguments["user_id"])
+        await asyncio.to_thread(memory.delete_all, user_id=arguments["user_id"])
         return [types.TextContent(type="text", text=f"All memories deleted for user {arguments['user_id']}.")]
     
     else:
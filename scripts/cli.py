@@ -17,22 +17,50 @@ from lib.memory_layer import get_memory_layer
 
 
 def ingest_command(args):
-    engine = get_rag_engine()
+    engine = get_rag_engine(embedding_workers=args.workers)
     
-    if args.file:
-        result = engine.ingest_file(args.file)
-        print(f"✓ Ingested file: {args.file}")
-        print(f"  Chunks: {result['chunks']}")
+    if args.dir:
+        if args.pipeline:
+            result = engine.ingest_pipelined(args.dir, force=args.force)
+        else:
+            result = engine.ingest_directory(args.dir, force=args.force)
+        print(f"✓ Ingested directory: {args.dir}")
+        print(f"  Files: {result['files']} ({result['unchanged']} unchanged, {result['removed_files']} removed)")
+        print(f"  Chunks: {result['chunks']} ({result['skipped']} unchanged, {result['removed']} deleted)")
+        for failure in result["failed"]:
+            print(f"  ✗ {failure['path'] or failure['stage']}: {failure['error']}")
+        for name, stage in result.get("stages", {}).items():
+            print(
+                f"  {name:<6} x{stage['workers']}: {stage['items_per_second']} items/s, {stage['mb_per_second']} MB/s, "
+                f"busy {stage['busy_seconds']}s, starved {stage['starved_seconds']}s, blocked {stage['blocked_seconds']}s"
+            )
+    elif args.file:
+        result = engine.ingest_file(args.file, force=args.force)
+        print(f"✓ {'Unchanged' if result['unchanged'] else 'Ingested'} file: {args.file}")
+        print(f"  Chunks: {result['chunks']} ({result['skipped']} unchanged)")
     elif args.text:
         result = engine.ingest_text(args.text)
         print(f"✓ Ingested text")
-        print(f"  Chunks: {result['chunks']}")
+        print(f"  Chunks: {result['chunks']} ({result['skipped']} unchanged)")
     else:
-        print("Error: Provide --file or --text")
+        print("Error: Provide --file, --text or --dir")
         sys.exit(1)
+    
+    cache = engine.cache_stats()["document_embeddings"]
+    if cache and cache["enabled"]:
+        print(f"  Embedding cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%})")
+    
+    engine.close()
 
 
 def search_command(args):
+    if not args.query and not args.queries_file:
+        print("Error: Provide a query or --queries-file")
+        sys.exit(1)
+    if args.user_id and not args.query:
+        print("Error: --user-id needs a single query")
+        sys.exit(1)
+    
     engine = get_rag_engine()
     
     if args.user_id:
@@ -50,8 +78,23 @@ def search_command(args):
         print(f"\n🧠 Memory Results ({len(results['memories'])}):\n")
         for i, mem in enumerate(results['memories'], 1):
             print(f"{i}. {mem.get('memory', 'N/A')}\n")
+        
+        timings = results['timings']
+        print(f"⏱  documents {timings['documents']:.3f}s, memories {timings['memories']:.3f}s, total {timings['total']:.3f}s")
+        for source, error in results['errors'].items():
+            print(f"⚠️  {source}: {error}")
+    elif args.queries_file:
+        queries = [line.strip() for line in Path(args.queries_file).read_text(encoding="utf-8").splitlines() if line.strip()]
+        all_results = engine.search_many(queries, limit=args.limit)
+        
+        for query, results in zip(queries, all_results):
+            print(f"\n🔎 {query}")
+            print(f"📄 Results ({len(results)}):\n")
+            for i, doc in enumerate(results, 1):
+                print(f"{i}. {doc['text'][:200]}...")
+                print(f"   Metadata: {doc['metadata']}\n")
     else:
-        results = engine.search(query=args.query, limit=args.limit)
+        results = engine.search(query=args.query, limit=args.limit, mode=args.mode)
         
         print(f"\n📄 Results ({len(results)}):\n")
         for i, doc in enumerate(results, 1):
@@ -102,6 +145,29 @@ def collections_command(args):
         print(f"{i}. {coll}")
 
 
+def maintain_command(args):
+    engine = get_rag_engine()
+    retention = args.retention_hours * 3600 if args.retention_hours is not None else None
+    reports = engine.vector_store.maintain(args.collection, retention_seconds=retention)
+    
+    print(f"\n🧹 Maintained {len(reports)} collection(s):\n")
+    for report in reports:
+        before, after = report["before"], report["after"]
+        print(f"{report['collection']}:")
+        print(f"  Fragments: {before['fragments']} -> {after['fragments']}")
+        print(f"  Versions: {before['versions']} -> {after['versions']}")
+        print(f"  Reclaimed: {report['bytes_reclaimed'] / 1024 / 1024:.1f} MB")
+        print(f"  Index optimized: {'yes' if report['index_optimized'] else 'no'} ({report['seconds']}s)\n")
+
+
+def reshard_command(args):
+    engine = get_rag_engine()
+    collection = args.collection or engine.collection_name
+    result = engine.vector_store.reshard(collection, args.shards)
+    
+    print(f"\n🔀 Resharded {result['collection']}: {result['from_shards']} -> {result['to_shards']} shards ({result['rows']} rows)")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Sovereign RAG Stack CLI")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
@@ -109,11 +175,17 @@ def main():
     ingest_parser = subparsers.add_parser("ingest", help="Ingest documents")
     ingest_parser.add_argument("--file", type=str, help="File path to ingest")
     ingest_parser.add_argument("--text", type=str, help="Text to ingest")
+    ingest_parser.add_argument("--dir", type=str, help="Directory to ingest recursively")
+    ingest_parser.add_argument("--workers", type=int, help="Embedding worker processes for bulk ingest")
+    ingest_parser.add_argument("--pipeline", action="store_true", help="Stream --dir through the staged ingest pipeline")
+    ingest_parser.add_argument("--force", action="store_true", help="Re-ingest files even if the manifest says they are unchanged")
     
     search_parser = subparsers.add_parser("search", help="Search documents")
-    search_parser.add_argument("query", type=str, help="Search query")
+    search_parser.add_argument("query", type=str, nargs="?", help="Search query")
+    search_parser.add_argument("--queries-file", type=str, help="File with one query per line, searched as a batch")
     search_parser.add_argument("--limit", type=int, default=5, help="Number of results")
     search_parser.add_argument("--user-id", type=str, help="Include user memories")
+    search_parser.add_argument("--mode", choices=["vector", "fts", "hybrid"], default="vector", help="Retrieval mode")
     
     memory_parser = subparsers.add_parser("memory", help="Manage memories")
     memory_parser.add_argument("action", choices=["add", "list", "search", "delete"], help="Memory action")
@@ -126,6 +198,14 @@ def main():
     
     collections_parser = subparsers.add_parser("collections", help="List collections")
     
+    maintain_parser = subparsers.add_parser("maintain", help="Compact tables and remove old versions")
+    maintain_parser.add_argument("--collection", type=str, help="Collection to maintain (default: all)")
+    maintain_parser.add_argument("--retention-hours", type=float, help="Keep versions newer than this")
+    
+    reshard_parser = subparsers.add_parser("reshard", help="Change a collection's shard count (pause writes first)")
+    reshard_parser.add_argument("--shards", type=int, required=True, help="New shard count")
+    reshard_parser.add_argument("--collection", type=str, help="Collection to reshard (default: engine collection)")
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -136,7 +216,9 @@ def main():
         "ingest": ingest_command,
         "search": search_command,
         "memory": memory_command,
-        "collections": collections_command
+        "collections": collections_command,
+        "maintain": maintain_command,
+        "reshard": reshard_command
     }
     
     commands[args.command](args)
@@ -1,14 +1,24 @@
 """
 Batch document ingestion for BUENATURA knowledge base
+
+Unchanged files are skipped using the ingest manifest. Memories of
+modified or removed files are deleted before a file is re-added.
 """
 
 import os
+import sys
 from pathlib import Path
 from mem0 import Memory
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.ingest_manifest import get_ingest_manifest, file_digest
+
 load_dotenv()
 
+MANIFEST_COLLECTION = "mem0"
+
 memory = Memory(
     config={
         "vector_store": {
@@ -20,36 +30,74 @@ memory = Memory(
     }
 )
 
+manifest = get_ingest_manifest(os.getenv("INGEST_MANIFEST_PATH", "C:\\BUENATURA\\mem0\\ingest_manifest.sqlite"))
+
+def forget(memory_ids):
+    for memory_id in memory_ids:
+        try:
+            memory.delete(memory_id=memory_id)
+        except Exception as e:
+            print(f"   ⚠️ Could not delete memory {memory_id}: {e}")
+
 def ingest_directory(directory: str, user_id: str = "valentin"):
-    """Ingest all documents in directory"""
+    """Ingest new and modified documents in directory"""
     path = Path(directory)
     supported_extensions = {'.txt', '.md', '.pdf', '.docx'}
     
     ingested = 0
+    unchanged = 0
     failed = 0
+    seen = set()
     
     for file_path in path.rglob('*'):
         if file_path.suffix.lower() in supported_extensions:
-            print(f"📄 Ingesting: {file_path.name}")
+            key = str(file_path.absolute())
+            seen.add(key)
             
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                stat = file_path.stat()
+                entry = manifest.get(MANIFEST_COLLECTION, key)
+                if manifest.is_unchanged(entry, stat):
+                    unchanged += 1
+                    continue
+                
+                data = file_path.read_bytes()
+                digest = file_digest(data)
+                if entry is not None and entry["digest"] == digest:
+                    manifest.touch(MANIFEST_COLLECTION, key, stat)
+                    unchanged += 1
+                    continue
                 
-                memory.add(
+                print(f"📄 Ingesting: {file_path.name}")
+                content = data.decode('utf-8')
+                
+                if entry is not None:
+                    forget(entry["chunk_ids"])
+                result = memory.add(
                     messages=[{
                         "role": "system",
                         "content": f"Document: {file_path.name}\n\n{content}"
                     }],
                     user_id=user_id
                 )
+                memory_ids = [r["id"] for r in result.get("results", []) if r.get("id")] if isinstance(result, dict) else []
+                manifest.put(MANIFEST_COLLECTION, key, stat, digest, memory_ids)
                 print(f"   ✅ Success")
                 ingested += 1
             except Exception as e:
                 print(f"   ❌ Failed: {e}")
                 failed += 1
     
-    return ingested, failed
+    prefix = str(path.absolute()) + os.sep
+    removed = 0
+    for key in manifest.paths(MANIFEST_COLLECTION, prefix=prefix):
+        if key not in seen:
+            print(f"🗑️ Removed: {Path(key).name}")
+            forget(manifest.get(MANIFEST_COLLECTION, key)["chunk_ids"])
+            manifest.remove(MANIFEST_COLLECTION, key)
+            removed += 1
+    
+    return ingested, unchanged, removed, failed
 
 if __name__ == "__main__":
     print("🚀 Starting BUENATURA knowledge ingestion...\n")
@@ -60,8 +108,10 @@ if __name__ == "__main__":
         print(f"❌ Directory not found: {knowledge_dir}")
         exit(1)
     
-    ingested, failed = ingest_directory(knowledge_dir)
+    ingested, unchanged, removed, failed = ingest_directory(knowledge_dir)
     
     print(f"\n✅ Ingestion complete")
     print(f"   Ingested: {ingested}")
+    print(f"   Unchanged: {unchanged}")
+    print(f"   Removed: {removed}")
     print(f"   Failed: {failed}")
@@ -0,0 +1,91 @@
+import random
+import string
+
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import PreTrainedTokenizerFast
+
+from lib.chunking import TokenChunker, WordChunker, token_offsets
+
+WORDS = ["the", "vector", "store", "chunk", "query", "index", "local", "model", "search", "memory"]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    # BERT-style WordPiece over single characters, so any alphanumeric word tokenizes offline
+    chars = string.ascii_lowercase + string.digits
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", ".", ","] + WORDS + list(chars) + [f"##{c}" for c in chars]
+    wordpiece = Tokenizer(models.WordPiece(
+        {token: i for i, token in enumerate(vocab)}, unk_token="[UNK]", max_input_chars_per_word=1000
+    ))
+    wordpiece.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    wordpiece.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=wordpiece, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]", pad_token="[PAD]"
+    )
+
+
+def _text(rng, words, long_words=0, long_tokens=150):
+    parts = [rng.choice(WORDS) for _ in range(words)]
+    for _ in range(long_words):
+        token = "".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(long_tokens))
+        parts.insert(rng.randrange(len(parts) + 1), token)
+    return " ".join(word + ("." if rng.random() < 0.1 else "") for word in parts)
+
+
+def _stream(window, text, piece_chars):
+    chunks, rest = [], text
+    while rest:
+        # pieces end at whitespace, as the ingest reader cuts them
+        piece, rest = rest[:piece_chars], rest[piece_chars:]
+        cut = piece.rfind(" ")
+        if rest and cut > 0:
+            piece, rest = piece[:cut + 1], piece[cut + 1:] + rest
+        chunks += window.feed(piece)
+    return chunks + window.finish()
+
+
+def _tokens(tokenizer, chunk):
+    return len(token_offsets(tokenizer, chunk)[0])
+
+
+def test_chunks_fit_the_model_window(tokenizer):
+    chunker = TokenChunker(tokenizer, 64, overlap_tokens=8)
+    chunks = chunker.chunk(_text(random.Random(0), 2000))
+
+    assert chunker.window == 62
+    assert len(chunks) > 1
+    assert all(_tokens(tokenizer, chunk) <= chunker.window for chunk in chunks)
+
+
+def test_word_longer_than_the_window_is_cut_at_the_limit(tokenizer):
+    chunker = TokenChunker(tokenizer, 64, overlap_tokens=8)
+    rng = random.Random(1)
+    word = "".join(rng.choice(string.ascii_lowercase) for _ in range(150))
+    chunks = chunker.chunk(f"the vector store {word} local model")
+
+    assert _tokens(tokenizer, word) == 150
+    assert 3 <= len(chunks) <= 4
+    assert all(_tokens(tokenizer, chunk) <= chunker.window for chunk in chunks)
+    assert min(len(chunk) for chunk in chunks) > 8
+    assert chunks[0] == "the vector store"
+    assert chunks[1] == word[:62]
+    assert chunks[-1].endswith(word[-20:] + " local model")
+
+
+@pytest.mark.parametrize("long_words", [0, 3])
+@pytest.mark.parametrize("piece_chars,flush_chars", [(50, 1), (300, 200), (5000, 65536)])
+def test_stream_matches_chunk(tokenizer, long_words, piece_chars, flush_chars):
+    chunker = TokenChunker(tokenizer, 64, overlap_tokens=16)
+    text = _text(random.Random(long_words), 1500, long_words=long_words)
+
+    assert _stream(chunker.stream(flush_chars=flush_chars), text, piece_chars) == chunker.chunk(text)
+
+
+def test_word_chunker_stream_matches_chunk():
+    chunker = WordChunker(chunk_size=40, overlap=7)
+    text = _text(random.Random(2), 1000)
+
+    assert _stream(chunker.stream(), text, 120) == chunker.chunk(text)
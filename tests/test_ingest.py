@@ -0,0 +1,62 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from lib.rag_engine import RAGEngine
+from lib.vector_store import VectorStore
+
+DIMENSION = 384
+
+
+class HashEmbeddings:
+    pool = None
+
+    def encode_bulk(self, texts):
+        return np.stack([np.random.default_rng(abs(hash(text)) % 2**32).random(DIMENSION) for text in texts])
+
+    def cache_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def _engine(path):
+    engine = RAGEngine(vector_db_path=str(path), collection_name="docs", chunker="words")
+    engine._embeddings = HashEmbeddings()
+    return engine
+
+
+def _rows(engine):
+    table = engine.vector_store.get_collection("docs").to_arrow()
+    return sorted(zip(table.column("id").to_pylist(), table.column("metadata").to_pylist()))
+
+
+def test_async_ingest_matches_sync(tmp_path):
+    text = " ".join(f"word{i % 97}" for i in range(3000))
+    sync, async_ = _engine(tmp_path / "sync"), _engine(tmp_path / "async")
+
+    result = sync.ingest_text(text, metadata={"source": "a"}, chunk_size=100, overlap=10)
+    async_result = asyncio.run(async_.aingest_text(text, metadata={"source": "a"}, chunk_size=100, overlap=10))
+
+    assert async_result == result
+    assert _rows(async_) == _rows(sync)
+    again = asyncio.run(async_.aingest_text(text, metadata={"source": "a"}, chunk_size=100, overlap=10))
+    assert again["skipped"] == again["chunks"] == result["chunks"]
+    sync.close()
+    async_.close()
+
+
+@pytest.mark.parametrize("upsert", ["sync", "async"])
+def test_upsert_keeps_the_last_duplicate(tmp_path, upsert):
+    store = VectorStore(db_path=str(tmp_path))
+    args = ("docs", ["a", "b", "a"], ["first", "b", "last"], np.random.rand(3, DIMENSION), [{}, {}, {"n": 2}])
+    if upsert == "sync":
+        counts = store.upsert_documents(*args)
+    else:
+        counts = asyncio.run(store.aupsert_documents(*args))
+
+    assert counts == {"inserted": 2, "updated": 0}
+    table = store.get_collection("docs").to_arrow()
+    assert dict(zip(table.column("id").to_pylist(), table.column("text").to_pylist())) == {"a": "last", "b": "b"}
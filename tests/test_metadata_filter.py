@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from lib.metadata_filter import compile_filter
+from lib.vector_store import VectorStore
+
+DOCS = {
+    "a": {"filename": "notes.md", "language": "markdown", "page": 9},
+    "b": {"filename": "rag_engine.py", "language": "python", "page": 10},
+    "c": {"filename": "rag-notes.md", "page": "x"},
+    "d": {"filename": "it's 100%_done\\.md", "page": -2.5},
+    "e": {"filename": "rag_", "apage": 50},
+    "f": {"user": 10, "tag": "o'brien"},
+    "g": {"user": 9}
+}
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    store = VectorStore(db_path=str(tmp_path_factory.mktemp("filters")))
+    store.add_documents(
+        "docs",
+        list(DOCS),
+        [f"text {doc_id}" for doc_id in DOCS],
+        np.random.rand(len(DOCS), 384).astype(np.float32),
+        list(DOCS.values())
+    )
+    return store
+
+
+def _matches(store, filter_metadata):
+    table = store.get_collection("docs")
+    where = compile_filter(filter_metadata, set(table.schema.names))
+    return sorted(table.search().where(where).select(["id"]).to_arrow().column("id").to_pylist())
+
+
+def test_no_filter():
+    assert compile_filter(None) is None
+    assert compile_filter({}) is None
+
+
+def test_typed_column_literals_are_quoted():
+    assert compile_filter({"filename": "it's"}) == "`filename` = 'it''s'"
+    assert compile_filter({"language": ["py", "md"]}) == "`language` IN ('py', 'md')"
+    assert compile_filter({"language": None}) == "`language` IS NULL"
+    assert compile_filter({"language": []}) == "FALSE"
+
+
+def test_prefix_compiles_to_a_range():
+    assert compile_filter({"filename": {"$prefix": "rag_"}}) == "`filename` >= 'rag_' AND `filename` < 'rag`'"
+    assert compile_filter({"filename": {"$prefix": "it'"}}) == "`filename` >= 'it''' AND `filename` < 'it('"
+
+
+def test_unknown_operator_and_bad_prefix_raise():
+    with pytest.raises(ValueError, match=r"\$like"):
+        compile_filter({"filename": {"$like": "x"}})
+    with pytest.raises(ValueError, match="prefix"):
+        compile_filter({"filename": {"$prefix": 1}})
+
+
+def test_string_range_on_json_key_raises():
+    with pytest.raises(ValueError, match="typed column"):
+        compile_filter({"page": {"$gt": "a"}})
+
+
+def test_equality_with_quotes_and_like_wildcards(store):
+    assert _matches(store, {"filename": "it's 100%_done\\.md"}) == ["d"]
+    assert _matches(store, {"tag": "o'brien"}) == ["f"]
+    assert _matches(store, {"tag": "o'%"}) == []
+    assert _matches(store, {"filename": "%"}) == []
+
+
+def test_prefix_matches_literally(store):
+    assert _matches(store, {"filename": {"$prefix": "rag_"}}) == ["b", "e"]
+    assert _matches(store, {"filename": {"$prefix": "it's 100%_"}}) == ["d"]
+    assert _matches(store, {"tag": {"$prefix": "o'b"}}) == ["f"]
+    assert _matches(store, {"tag": {"$prefix": "_"}}) == []
+
+
+def test_numeric_range_on_json_key(store):
+    assert _matches(store, {"page": {"$gt": 9}}) == ["b"]
+    assert _matches(store, {"page": {"$gte": -3, "$lt": 9.5}}) == ["a", "d"]
+    assert _matches(store, {"page": {"$lte": 100}}) == ["a", "b", "d"]  # not "x" or apage
+
+
+def test_numeric_range_on_typed_column_is_numeric(store):
+    assert _matches(store, {"user": {"$gt": 9}}) == ["f"]
+    assert _matches(store, {"user": {"$gt": "9"}}) == []  # string bounds stay lexicographic
+
+
+def test_injection_stays_inside_the_literal(store):
+    assert _matches(store, {"filename": "x' OR '1'='1"}) == []
+    assert _matches(store, {"tag": "x' OR '1'='1"}) == []
+    assert _matches(store, {"page') OR TRUE OR ('": {"$gt": 0}}) == []
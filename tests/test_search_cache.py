@@ -0,0 +1,161 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from lib.rag_engine import RAGEngine
+from lib.search_cache import SearchResultCache
+
+DIMENSION = 384
+
+
+class FixedQueryEncoder:
+    def encode_single_array(self, query):
+        vector = np.zeros(DIMENSION, dtype=np.float32)
+        vector[0] = 1.0
+        return vector
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def _vector(offset):
+    vector = np.zeros(DIMENSION, dtype=np.float32)
+    vector[0] = 1.0 - offset
+    vector[1] = offset
+    return vector
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = RAGEngine(vector_db_path=str(tmp_path), collection_name="docs", chunker="words")
+    engine._query_encoder = FixedQueryEncoder()
+    _upsert(engine, {"a": ("alpha", 0.1), "b": ("beta", 0.2)})
+    yield engine
+    engine.close()
+
+
+def _upsert(engine, docs):
+    engine.vector_store.upsert_documents(
+        "docs",
+        list(docs),
+        [text for text, _ in docs.values()],
+        np.stack([_vector(offset) for _, offset in docs.values()]),
+        [{} for _ in docs]
+    )
+
+
+def _ids(results):
+    return [row["id"] for row in results]
+
+
+def _search(engine):
+    return _ids(engine.search("some query", limit=5))
+
+
+def test_repeated_search_hits_the_cache(engine):
+    first = _search(engine)
+    assert _search(engine) == first == ["a", "b"]
+    assert _ids(engine.search("  Some   QUERY ", limit=5)) == first
+
+    stats = engine.search_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert _ids(engine.search("some query", limit=1)) == ["a"]  # limit is part of the key
+    assert engine.search_cache.stats()["misses"] == 2
+
+
+def test_upsert_invalidates(engine):
+    assert _search(engine) == ["a", "b"]
+    _upsert(engine, {"c": ("gamma", 0.0)})
+
+    assert _search(engine) == ["c", "a", "b"]
+    assert engine.search_cache.stats()["invalidations"] >= 1
+
+
+def test_delete_invalidates(engine):
+    assert _search(engine) == ["a", "b"]
+    engine.vector_store.delete_documents("docs", ["a"])
+
+    assert _search(engine) == ["b"]
+
+
+def test_async_upsert_invalidates(engine):
+    async def run():
+        before = _ids(await engine.asearch("some query", limit=5))
+        await engine.vector_store.aupsert_documents(
+            "docs", ["c"], ["gamma"], np.stack([_vector(0.0)]), [{}]
+        )
+        return before, _ids(await engine.asearch("some query", limit=5))
+
+    before, after = asyncio.run(run())
+    assert before == ["a", "b"]
+    assert after == ["c", "a", "b"]
+    assert _search(engine) == ["c", "a", "b"]
+
+
+def test_reshard_invalidates(engine):
+    assert _search(engine) == ["a", "b"]
+    version = engine.vector_store.collection_version("docs")
+    engine.vector_store.reshard("docs", 2)
+
+    assert engine.vector_store.collection_version("docs") != version
+    assert _search(engine) == ["a", "b"]
+    _upsert(engine, {"c": ("gamma", 0.0)})
+    assert _search(engine) == ["c", "a", "b"]
+
+
+def _key(cache, query, versions, epoch=0):
+    return cache.key(query, "docs", None, 5, (epoch, tuple(("docs", v) for v in versions)))
+
+
+def test_results_from_an_older_version_are_not_stored():
+    cache = SearchResultCache(max_bytes=1024 * 1024)
+    cache.put(_key(cache, "q", [2]), [{"id": "new"}])
+
+    # a search that started before the write finishes after it
+    cache.put(_key(cache, "stale", [1]), [{"id": "old"}])
+    assert cache.get(_key(cache, "stale", [2])) is None
+    assert cache.get(_key(cache, "stale", [1])) is None
+    assert cache.get(_key(cache, "q", [2])) == [{"id": "new"}]
+
+
+def test_new_version_drops_the_collection_entries():
+    cache = SearchResultCache(max_bytes=1024 * 1024)
+    cache.put(_key(cache, "q", [1]), [{"id": "a"}])
+    cache.put(cache.key("q", "other", None, 5, (0, (("other", 1),))), [{"id": "x"}])
+
+    assert cache.get(_key(cache, "q", [2])) is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["invalidations"]) == (1, 1)
+
+
+def test_epoch_and_layout_changes_are_never_older():
+    older = SearchResultCache._is_older
+    assert older((0, (("docs", 1),)), (0, (("docs", 2),)))
+    assert not older((0, (("docs", 3),)), (0, (("docs", 2),)))
+    assert older((0, (("docs", 9),)), (1, (("docs", 1),)))  # epoch wins over table versions
+    assert not older((1, (("docs__g1_s0", 1), ("docs__g1_s1", 1))), (1, (("docs", 5),)))
+
+
+def test_lru_eviction_under_the_byte_budget():
+    cache = SearchResultCache(max_bytes=3000)
+    for i in range(20):
+        cache.put(_key(cache, f"q{i}", [1]), [{"text": "t" * 200}])
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 3000
+    assert stats["evictions"] == 20 - stats["entries"]
+    assert cache.get(_key(cache, "q19", [1])) is not None
+    assert cache.get(_key(cache, "q0", [1])) is None
+
+
+def test_cached_results_are_copies():
+    cache = SearchResultCache(max_bytes=1024 * 1024)
+    key = _key(cache, "q", [1])
+    cache.put(key, [{"id": "a", "metadata": {"k": 1}}])
+    cache.get(key)[0]["metadata"]["k"] = 2
+
+    assert cache.get(key) == [{"id": "a", "metadata": {"k": 1}}]
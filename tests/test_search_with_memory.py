@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from lib.rag_engine import RAGEngine
+
+
+class SlowMemory:
+    def __init__(self, seconds, fail=False):
+        self.seconds = seconds
+        self.fail = fail
+
+    def search(self, query, user_id, limit):
+        time.sleep(self.seconds)
+        if self.fail:
+            raise RuntimeError("memory down")
+        return {"results": [{"memory": "m"}]}
+
+
+def _engine(tmp_path, documents_seconds, memory):
+    engine = RAGEngine(vector_db_path=str(tmp_path), collection_name="docs", chunker="words")
+    engine.memory = memory
+
+    def search(query, limit):
+        time.sleep(documents_seconds)
+        return [{"id": "d"}]
+
+    async def asearch(query, limit):
+        await asyncio.sleep(documents_seconds)
+        return [{"id": "d"}]
+
+    engine.search, engine.asearch = search, asearch
+    return engine
+
+
+def _run(engine, mode, **kwargs):
+    if mode == "sync":
+        return engine.search_with_memory("q", "u", **kwargs)
+    return asyncio.run(engine.asearch_with_memory("q", "u", **kwargs))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_memory_finishing_after_its_deadline_is_dropped(tmp_path, mode):
+    # documents take longer than the memory deadline, so the memory result is ready when it is collected
+    engine = _engine(tmp_path, 0.4, SlowMemory(0.2))
+    result = _run(engine, mode, document_timeout=1.0, memory_timeout=0.1)
+
+    assert result["documents"] == [{"id": "d"}]
+    assert result["memories"] == []
+    assert result["errors"] == {"memories": "timed out after 0.1s"}
+    assert result["timings"]["memories"] == 0.1
+    assert 0.4 <= result["timings"]["documents"] < 1.0
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_timings_run_from_the_start_of_the_request(tmp_path, mode):
+    engine = _engine(tmp_path, 0.3, SlowMemory(0.1, fail=True))
+    result = _run(engine, mode, document_timeout=1.0, memory_timeout=1.0)
+
+    assert result["errors"] == {"memories": "memory down"}
+    assert 0.1 <= result["timings"]["memories"] < 0.3
+    assert 0.3 <= result["timings"]["documents"] <= result["timings"]["total"]
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_zero_timeout_is_not_the_default(tmp_path, mode):
+    engine = _engine(tmp_path, 0.0, SlowMemory(0.05))
+    result = _run(engine, mode, memory_timeout=0)
+
+    assert result["documents"] == [{"id": "d"}]
+    assert result["errors"] == {"memories": "timed out after 0s"}
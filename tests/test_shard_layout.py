@@ -0,0 +1,85 @@
+import numpy as np
+
+from lib.shard_layout import ShardLayout, merge_by_rank, merge_top_k, route, shard_of
+from lib.vector_store import VectorStore
+
+
+def _add(store, collection, ids):
+    store.add_documents(
+        collection,
+        ids,
+        [f"text {doc_id}" for doc_id in ids],
+        np.random.rand(len(ids), 384).astype(np.float32),
+        [{} for _ in ids]
+    )
+
+
+def _all_ids(store, collection):
+    ids = []
+    for table_name in store._shards(collection):
+        ids.extend(store.get_collection(table_name).to_arrow().column("id").to_pylist())
+    return ids
+
+
+def test_route_is_stable_and_covers_every_row():
+    ids = [f"doc-{i}" for i in range(200)]
+    positions = route(ids, 4)
+
+    assert sorted(p for part in positions for p in part) == list(range(200))
+    for shard, part in enumerate(positions):
+        assert all(shard_of(ids[p], 4) == shard for p in part)
+    assert route(ids, 4) == positions
+    assert route(ids, 1) == [list(range(200))]
+
+
+def test_merge_top_k_merges_sorted_parts():
+    parts = [
+        [{"id": "a", "_distance": 0.1}, {"id": "b", "_distance": 0.5}],
+        [{"id": "c", "_distance": 0.2}, {"id": "d", "_distance": 0.3}],
+        []
+    ]
+    assert [row["id"] for row in merge_top_k(parts, 3, "_distance")] == ["a", "c", "d"]
+
+    scored = [[{"id": "a", "_score": 9.0}, {"id": "b", "_score": 1.0}], [{"id": "c", "_score": 5.0}]]
+    assert [row["id"] for row in merge_top_k(scored, 2, "_score", descending=True)] == ["a", "c"]
+
+
+def test_merge_by_rank_interleaves_shards():
+    parts = [
+        [{"id": "a", "_score": 1.0}, {"id": "b", "_score": 0.9}],
+        [{"id": "c", "_score": 8.0}, {"id": "d", "_score": 7.0}]
+    ]
+    # scores are not comparable across shards; rank decides, score breaks ties
+    assert [row["id"] for row in merge_by_rank(parts, 3, "_score")] == ["c", "a", "d"]
+
+
+def test_reshard_keeps_every_row_once(tmp_path):
+    store = VectorStore(db_path=str(tmp_path))
+    ids = [f"doc-{i}" for i in range(50)]
+    _add(store, "docs", ids)
+
+    report = store.reshard("docs", 3)
+
+    assert report == {"collection": "docs", "rows": 50, "from_shards": 1, "to_shards": 3}
+    assert store._shards("docs") == ShardLayout.table_names("docs", 1, 3)
+    assert sorted(_all_ids(store, "docs")) == sorted(ids)
+    assert store.list_collections() == ["docs"]
+
+    store.reshard("docs", 2)
+    assert sorted(_all_ids(store, "docs")) == sorted(ids)
+
+
+def test_reshard_replaces_tables_from_an_interrupted_run(tmp_path):
+    store = VectorStore(db_path=str(tmp_path))
+    ids = [f"doc-{i}" for i in range(50)]
+    _add(store, "docs", ids)
+    # partial tables of the same generation, as left by a crash mid-copy
+    _add(store, "docs__g1_s0", ids[:10])
+    _add(store, "docs__g1_s5", ids[10:12])
+
+    store.reshard("docs", 3)
+
+    assert sorted(_all_ids(store, "docs")) == sorted(ids)
+    assert not any(name.startswith("docs__g1_s5") for name in store.db.table_names())
+    results = store.search("docs", np.random.rand(384).astype(np.float32), limit=50)
+    assert len({row["id"] for row in results}) == len(results) == 50
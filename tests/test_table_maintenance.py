@@ -0,0 +1,52 @@
+import numpy as np
+
+from lib.vector_store import VectorStore
+
+
+def _add(store, collection, batch, rows=20):
+    ids = [f"doc-{batch}-{i}" for i in range(rows)]
+    store.add_documents(
+        collection,
+        ids,
+        [f"text {batch} {i}" for i in range(rows)],
+        np.random.rand(rows, 384).astype(np.float32),
+        [{"source": f"file-{batch}"} for _ in range(rows)]
+    )
+
+
+def _maintain_indexed(store, collection):
+    table = store.get_collection(collection)
+    report = store.maintenance.maintain(collection, table, retention_seconds=0)
+    table.checkout_latest()
+    return table, report
+
+
+def test_maintain_with_scalar_index(tmp_path):
+    store = VectorStore(db_path=str(tmp_path))
+    _add(store, "docs", 0)
+    store.existing_ids("docs", ["doc-0-0"])  # builds id_idx
+    for batch in range(1, 6):
+        _add(store, "docs", batch)
+
+    table, report = _maintain_indexed(store, "docs")
+
+    assert report["index_optimized"]
+    assert report["after"]["fragments"] < report["before"]["fragments"]
+    assert report["versions_removed"] > 0
+    assert table.count_rows() == 120
+    assert store.existing_ids("docs", ["doc-5-19", "missing"]) == {"doc-5-19"}
+
+
+def test_maintain_with_vector_index(tmp_path):
+    store = VectorStore(db_path=str(tmp_path))
+    _add(store, "docs", 0, rows=512)
+    assert store.ensure_index("docs", force=True, wait=True)
+    for batch in range(1, 4):
+        _add(store, "docs", batch)
+
+    table, report = _maintain_indexed(store, "docs")
+
+    assert report["index_optimized"]
+    assert report["versions_removed"] > 0
+    assert table.count_rows() == 572
+    assert store.search("docs", np.random.rand(384).astype(np.float32), limit=3)